@@ -7,10 +7,16 @@ class Settings(BaseSettings):
     vllm_base_url: str = "http://localhost:8000/v1"
     vllm_model: str = "Qwen/Qwen3-32B"
 
+    # LLM request pacing (tool-calling loop)
+    llm_rpm: int = 0  # requests/minute token bucket; 0 = unlimited
+    llm_max_concurrent: int = 16  # in-flight tool-calling LLM requests
+    llm_max_retries: int = 2  # vLLM retries on timeouts / 429 / 5xx gateway errors
+
     # FalkorDB
     falkordb_host: str = "localhost"
     falkordb_port: int = 6379
     falkordb_graph_name: str = "personal_life"
+    falkordb_max_connections: int = 16  # pool cap; extra queries wait for a free connection
 
     # Qdrant
     qdrant_host: str = "localhost"
@@ -26,10 +32,13 @@ class Settings(BaseSettings):
     bge_model_name: str = "BAAI/bge-m3"
     bge_device: str = "cuda"
     bge_dimension: int = 1024
+    bge_batch_size: int = 32
+    bge_fp16: bool = True  # half-precision weights when bge_device is CUDA
 
     # API
     api_host: str = "0.0.0.0"
     api_port: int = 8500
+    eager_tasks: bool = False  # opt-in asyncio.eager_task_factory on the server loop (needs Python 3.12+)
 
     # Memory
     working_memory_size: int = 4
@@ -60,9 +69,27 @@ class Settings(BaseSettings):
     agentic_max_retries: int = 1
     self_rag_threshold: float = 0.3
 
+    # Tool Calling
+    search_backend_timeout: float = 5.0  # per-backend cap in search_knowledge (seconds)
+    search_max_concurrency: int = 8  # concurrent search_knowledge backend calls
+    search_section_early_exit_chars: int = 0  # return sections alone if this long; 0 = always merge all
+
+    # Semantic response cache (read-only tool turns, per user, in-process)
+    response_cache_enabled: bool = False
+    response_cache_threshold: float = 0.92
+    response_cache_ttl_seconds: int = 3600  # writes invalidate anyway; entries are also day-scoped
+    response_cache_max_entries: int = 256  # per user per day
+    response_cache_min_chars: int = 12  # shorter (or < 3 words) messages are follow-ups; never cached
+
     # Conversation (Phase 4)
     daily_summary_interval: int = 10
     core_memory_interval: int = 20
+    fuse_memory_triggers: bool = True  # one LLM call when both are due; False = two calls, run concurrently
+    memory_trigger_min_chars: int = 200  # skip summary/preference LLM calls for smaller transcripts
+    memory_trigger_max_chars: int = 12000  # keep only the most recent part of longer transcripts
+    memory_tasks_max_inflight: int = 64  # periodic summary/preference runs in the background; extra runs are skipped
+    memory_llm_max_concurrent: int = 8  # LLM calls made by periodic memory tasks across all sessions
+    conversation_vector_skip_after: int = 20  # exchanges per session; later chit-chat (no tools, no storable keyword) isn't embedded. 0 = always
 
     # Telegram (Phase 5)
     telegram_bot_token: str = ""
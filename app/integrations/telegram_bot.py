@@ -475,9 +475,9 @@ async def cmd_report(message: Message):
         f"الإجمالي: {data['total']} {data['currency']}",
         "",
     ]
-    for cat in data.get("by_category", []):
-        lines.append(f"• {cat['category']}: {cat['total']} ({cat['percentage']}%)")
-    if not data.get("by_category"):
+    by_cat = data.get("by_category", [])
+    lines.extend(f"• {cat['category']}: {cat['total']} ({cat['percentage']}%)" for cat in by_cat)
+    if not by_cat:
         lines.append("لا توجد مصاريف هذا الشهر.")
     await send_reply(message, "\n".join(lines))
 
@@ -487,22 +487,18 @@ def _format_inventory_report_ar(data: dict) -> str:
     lines.append(f"الإجمالي: {data['total_items']} غرض ({data['total_quantity']} وحدة)")
     if data.get("by_category"):
         lines.append("\n📂 حسب الفئة:")
-        for c in data["by_category"]:
-            lines.append(f"  • {c['category']}: {c['items']} أغراض ({c['quantity']} وحدة)")
+        lines.extend(f"  • {c['category']}: {c['items']} أغراض ({c['quantity']} وحدة)" for c in data["by_category"])
     if data.get("by_location"):
         lines.append("\n📍 حسب المكان:")
-        for loc in data["by_location"]:
-            lines.append(f"  • {loc['location']}: {loc['items']} أغراض")
+        lines.extend(f"  • {loc['location']}: {loc['items']} أغراض" for loc in data["by_location"])
     if data.get("by_condition"):
         lines.append("\n🔧 حسب الحالة:")
-        for c in data["by_condition"]:
-            lines.append(f"  • {c['condition']}: {c['count']}")
+        lines.extend(f"  • {c['condition']}: {c['count']}" for c in data["by_condition"])
     lines.append(f"\n⚠️ بدون مكان: {data.get('without_location', 0)}")
     lines.append(f"💤 مهملة: {data.get('unused_count', 0)}")
     if data.get("top_by_quantity"):
         lines.append("\n🏆 أكثر كمية:")
-        for t in data["top_by_quantity"][:5]:
-            lines.append(f"  • {t['name']}: {t['quantity']}")
+        lines.extend(f"  • {t['name']}: {t['quantity']}" for t in data["top_by_quantity"][:5])
     return "\n".join(lines)
 
 
@@ -528,13 +524,11 @@ async def cmd_inventory(message: Message):
     by_cat = data.get("by_category", [])
     if by_cat:
         lines.append("حسب الفئة:")
-        for c in by_cat:
-            lines.append(f"  • {c['category']}: {c['count']} أغراض ({c['quantity']} حبة)")
+        lines.extend(f"  • {c['category']}: {c['count']} أغراض ({c['quantity']} حبة)" for c in by_cat)
     by_loc = data.get("by_location", [])
     if by_loc:
         lines.append("\nحسب المكان:")
-        for loc in by_loc:
-            lines.append(f"  • {loc['location']}: {loc['count']} أغراض")
+        lines.extend(f"  • {loc['location']}: {loc['count']} أغراض" for loc in by_loc)
     if not by_cat and not by_loc:
         lines.append("لا توجد أغراض مسجلة.")
     await send_reply(message, "\n".join(lines))
@@ -1189,8 +1183,10 @@ def format_stalled_projects(data: dict) -> str:
         return ""
     days = data.get("days_threshold", 14)
     lines = [f"مشاريع متوقفة (>{days} يوم):"]
-    for p in projects:
-        lines.append(f"  - {p['name']} (آخر نشاط: {p['last_activity']}, {p['task_count']} مهام)")
+    lines.extend(
+        f"  - {p['name']} (آخر نشاط: {p['last_activity']}, {p['task_count']} مهام)"
+        for p in projects
+    )
     return "\n".join(lines)
 
 
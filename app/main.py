@@ -1,5 +1,9 @@
+import asyncio
+import atexit
 import logging
+import queue
 from contextlib import asynccontextmanager
+from logging.handlers import QueueHandler, QueueListener
 
 from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
@@ -26,10 +30,16 @@ from app.services.tool_calling import ToolCallingService
 from app.services.user_registry import UserRegistry
 from app.services.vector import VectorService
 
-logging.basicConfig(
-    level=logging.INFO,
-    format="%(asctime)s [%(levelname)s] %(name)s: %(message)s",
-)
+# Handlers only enqueue; formatting and stderr writes happen on the listener thread
+_log_queue: queue.SimpleQueue = queue.SimpleQueue()
+_log_stream = logging.StreamHandler()
+_log_stream.setFormatter(logging.Formatter("%(asctime)s [%(levelname)s] %(name)s: %(message)s"))
+_log_listener = QueueListener(_log_queue, _log_stream, respect_handler_level=True)
+_log_listener.start()
+atexit.register(_log_listener.stop)  # drains the queue on exit
+_log_queue_handler = QueueHandler(_log_queue)
+_log_queue_handler.setFormatter(logging.Formatter("%(message)s"))  # full format applied by the listener
+logging.basicConfig(level=logging.INFO, handlers=[_log_queue_handler])
 logger = logging.getLogger(__name__)
 settings = get_settings()
 
@@ -39,6 +49,11 @@ async def lifespan(app: FastAPI):
     # --- Startup ---
     logger.info("Starting services...")
 
+    # Tasks that finish without suspending (cached tool reads, validation errors)
+    # complete inside create_task/gather instead of taking an extra loop hop
+    if settings.eager_tasks and hasattr(asyncio, "eager_task_factory"):
+        asyncio.get_running_loop().set_task_factory(asyncio.eager_task_factory)
+
     llm = LLMService()
     graph = GraphService()
     vector = VectorService()
@@ -104,6 +119,7 @@ async def lifespan(app: FastAPI):
 
     # --- Shutdown ---
     logger.info("Shutting down services...")
+    await tool_calling.stop()
     await ha_svc.stop()
     await memory.stop()
     await vector.stop()
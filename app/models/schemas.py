@@ -1,9 +1,9 @@
 import datetime as dt
 from dataclasses import dataclass, field
 from enum import Enum
-from typing import Annotated, Optional
+from typing import Annotated, Any, Optional
 
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, field_validator
 
 
 # --- Multi-Tenancy ---
@@ -574,3 +574,24 @@ class FocusStartRequest(BaseModel):
 
 class FocusCompleteRequest(BaseModel):
     completed: bool = True
+
+
+# --- Memory extraction (LLM JSON output) ---
+
+class CorePreferences(BaseModel):
+    preferences: Optional[dict[str, Any]] = {}
+
+    @field_validator("preferences", mode="before")
+    @classmethod
+    def _preferences_or_empty(cls, v: Any) -> dict:
+        # Models emit null or a list when nothing was learned
+        return v if isinstance(v, dict) else {}
+
+
+class SummaryAndPreferences(CorePreferences):
+    summary: Optional[str] = ""
+
+    @field_validator("summary", mode="before")
+    @classmethod
+    def _summary_or_empty(cls, v: Any) -> str:
+        return v if isinstance(v, str) else ""
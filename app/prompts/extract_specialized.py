@@ -244,14 +244,33 @@ _EXTRACTORS = {
 }
 
 
-def build_specialized_extract(text: str, route: str, ner_hints: str = "", conversation_context: str = "") -> list[dict]:
+_ARABIC_INPUT_HINT = (
+    "\n\nThe user message is in Saudi Arabic. Translate it to English in your head first, "
+    "then extract from that translation: write entity names, properties and relationships "
+    "in English (keep proper nouns as-is). Output only the JSON."
+)
+
+
+def build_specialized_extract(
+    text: str, route: str, ner_hints: str = "", conversation_context: str = "",
+    arabic_input: bool = False, allowed_types: list[str] | None = None,
+) -> list[dict]:
     """Build chat messages for a specialized extractor based on route.
 
     Picks the correct domain extractor, injects date hints, prepends NER hints.
-    Falls back to 'general' extractor for unknown routes.
+    Falls back to 'general' extractor for unknown routes. With arabic_input the
+    extractor translates as part of the same call (no separate translate step);
+    allowed_types restricts which entity types the model may emit.
     """
     extractor_key = ROUTE_TO_EXTRACTOR.get(route, "general")
     system_prompt, examples = _EXTRACTORS[extractor_key]
+    if arabic_input:
+        system_prompt += _ARABIC_INPUT_HINT
+    if allowed_types:
+        system_prompt += (
+            f"\n\nOnly extract entities of these types: {', '.join(allowed_types)}. "
+            "Ignore everything else; return {\"entities\": []} if nothing matches."
+        )
 
     # Inject today/tomorrow date hint
     riyadh_tz = timezone(timedelta(hours=_gs().timezone_offset_hours))
@@ -1,11 +1,14 @@
 """System prompt for tool-calling chat mode."""
 
 from datetime import datetime, timedelta, timezone
+from functools import lru_cache
 
 from app.config import get_settings
 
 settings = get_settings()
 
+_TZ = timezone(timedelta(hours=settings.timezone_offset_hours))
+
 # Gender replacements applied when is_female=True
 _FEMALE_REPLACEMENTS = [
     # Intro section
@@ -31,8 +34,19 @@ def build_tool_system_prompt(
     is_female: bool = False,
 ) -> str:
     """Build Arabic system prompt for tool-calling mode."""
-    riyadh_tz = timezone(timedelta(hours=settings.timezone_offset_hours))
-    now = datetime.now(riyadh_tz)
+    # The prompt only shows HH:MM, so renders are reusable within the minute
+    now = datetime.now(_TZ).replace(second=0, microsecond=0)
+    return _render_tool_system_prompt(memory_context, active_project, user_name, is_female, now)
+
+
+@lru_cache(maxsize=256)
+def _render_tool_system_prompt(
+    memory_context: str,
+    active_project: str | None,
+    user_name: str,
+    is_female: bool,
+    now: datetime,
+) -> str:
     today_str = now.strftime("%Y-%m-%d")
     tomorrow_str = (now + timedelta(days=1)).strftime("%Y-%m-%d")
     weekdays_ar = [
@@ -51,17 +65,13 @@ def build_tool_system_prompt(
 - لو {user_name} يبي يلغي التركيز، استخدم manage_projects مع action=unfocus
 """
 
+    # Static persona + instructions first, per-turn parts (time, memory, active
+    # project) last, so the prefix stays byte-identical for LLM prefix caching
     prompt = f"""أنت السكرتير الشخصي ل{user_name} — شاطر ومنظم وتهتم بكل التفاصيل.
 شغلك: تنظيم حياته الشخصية، ترتيب أفكاره وخططه، متابعة مشاريعه وأنشطته، وإدارة تذكيراته ومصاريفه.
 أسلوبك: سعودي عامي، تناديه "{user_name}"، محترم مثل سكرتير يحترم مديره.
 التنسيق: استخدم الإيموجي 📋✅📌🔔💰 عشان الردود تكون مرتبة وواضحة. نظّم القوائم بنقاط مرتبة.
 
-الوقت: {now.strftime("%H:%M")} | اليوم: {today_weekday} {today_str} | بكرة: {tomorrow_weekday} {tomorrow_str}
-⚠️ لما تذكر يوم أسبوع لتاريخ معين: اليوم={today_weekday}، بكرة={tomorrow_weekday}. لأي تاريخ ثاني لا تخمن اسم اليوم — اكتب التاريخ فقط بدون يوم الأسبوع.
-
-ذاكرتك:
-{memory_context}
-{active_project_section}
 تعليمات:
 - ⛔ قاعدة حرجة: أي إجراء يغيّر البيانات (إنشاء، تعديل، حذف، تأجيل) لازم يمر عبر استدعاء أداة (tool_use). ممنوع تقول "تم الحذف" أو "تم الإضافة" بدون ما تستدعي الأداة فعلياً — هذا كذب. لو ما استدعيت الأداة، الإجراء ما تنفذ. هذا ينطبق على: التذكيرات، المصاريف، الديون، المهام، المشاريع، القوائم، الأجهزة الذكية، والملاحظات.
 - عندك أدوات (tools) تقدر تستخدمها. لو {user_name} يبي إجراء (تذكير، مصروف، حذف، دين)، استخدم الأداة المناسبة.
@@ -117,7 +127,14 @@ def build_tool_system_prompt(
 - ممنوع تقول "تم" أو "حذفت" أو "أضفت" أو "عدّلت" إلا إذا استدعيت الأداة فعلياً ورجعت نجاح. لو ما استدعيت أداة = ما تنفذ شي = ممنوع تدّعي إنك سويت الإجراء.
 - ردك لازم يكون نص عربي طبيعي — ممنوع JSON أو كود.
 - لا تضيف أسئلة متابعة في نهاية ردك مثل "تبي أبحث؟" أو "تبي تفاصيل أكثر؟". لو تقدر تجيب المعلومة، جبها مباشرة.
-- لو {user_name} يبي إجراء، كن مختصر بالتأكيد. لو يسأل عن قوائم، اعرضها كاملة."""
+- لو {user_name} يبي إجراء، كن مختصر بالتأكيد. لو يسأل عن قوائم، اعرضها كاملة.
+
+الوقت: {now.strftime("%H:%M")} | اليوم: {today_weekday} {today_str} | بكرة: {tomorrow_weekday} {tomorrow_str}
+⚠️ لما تذكر يوم أسبوع لتاريخ معين: اليوم={today_weekday}، بكرة={tomorrow_weekday}. لأي تاريخ ثاني لا تخمن اسم اليوم — اكتب التاريخ فقط بدون يوم الأسبوع.
+
+ذاكرتك:
+{memory_context}
+{active_project_section}"""
 
     # Apply gender-specific replacements for female users
     if is_female:
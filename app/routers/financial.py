@@ -1,15 +1,20 @@
-from datetime import datetime
+from datetime import datetime, timedelta, timezone
 
 from fastapi import APIRouter, Request
 
+from app.config import get_settings
 from app.models.schemas import (
     DebtPaymentRequest,
     DebtSummaryResponse,
     MonthlyReport,
 )
 
+settings = get_settings()
+
 router = APIRouter(prefix="/financial", tags=["financial"])
 
+_TZ = timezone(timedelta(hours=settings.timezone_offset_hours))
+
 
 @router.get("/report", response_model=MonthlyReport)
 async def financial_report(
@@ -19,9 +24,12 @@ async def financial_report(
     compare: bool = False,
 ):
     graph = request.app.state.retrieval.graph
-    now = datetime.utcnow()
-    m = month or now.month
-    y = year or now.year
+    if month and year:
+        m, y = month, year
+    else:
+        now = datetime.now(_TZ)
+        m = month or now.month
+        y = year or now.year
 
     if compare:
         report = await graph.query_month_comparison(m, y)
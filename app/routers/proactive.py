@@ -14,11 +14,12 @@ router = APIRouter(prefix="/proactive", tags=["proactive"])
 
 settings = get_settings()
 
+_TZ = timezone(timedelta(hours=settings.timezone_offset_hours))
+
 
 def _now_local() -> datetime:
     """Current datetime in the configured timezone."""
-    tz = timezone(timedelta(hours=settings.timezone_offset_hours))
-    return datetime.now(tz)
+    return datetime.now(_TZ)
 
 
 # --- Request models ---
@@ -275,10 +275,7 @@ class BackupService:
                         payload=p.get("payload", {}),
                     )
                 )
-            await self.vector._client.upsert(
-                collection_name=self.vector._collection(),
-                points=points,
-            )
+            await self.vector.upsert_points(points)
             total += len(points)
         return {"points_restored": total}
 
@@ -3,6 +3,7 @@ import calendar
 import logging
 import re
 from datetime import datetime, timedelta, timezone
+from functools import lru_cache
 
 from dateutil.relativedelta import relativedelta
 from falkordb.asyncio import FalkorDB
@@ -10,11 +11,45 @@ from redis.asyncio import BlockingConnectionPool
 
 from app.config import get_settings
 from app.middleware.auth import _current_graph_name
+from app.services.response_cache import note_write
 
 logger = logging.getLogger(__name__)
 
 settings = get_settings()
 
+_TOUCH_FLUSH_INTERVAL = 0.5  # seconds between batched Item.last_used_at writes
+
+_WRITE_CYPHER_RE = re.compile(r"\b(?:CREATE|MERGE|SET|DELETE|REMOVE)\b", re.IGNORECASE)
+
+
+@lru_cache(maxsize=1024)
+def _is_write_query(cypher: str) -> bool:
+    return _WRITE_CYPHER_RE.search(cypher) is not None
+
+
+class _TrackedGraph:
+    """FalkorDB graph handle that reports write queries to the response cache.
+
+    Every write — tools, routers, scheduler, uploads, cross-user — goes
+    through a handle selected for the graph it writes to, so the right
+    tenant's cached replies are invalidated.
+    """
+
+    __slots__ = ("_graph", "_name")
+
+    def __init__(self, graph, name: str):
+        self._graph = graph
+        self._name = name
+
+    async def query(self, q: str, params: dict | None = None, **kwargs):
+        result = await self._graph.query(q, params=params, **kwargs)
+        if _is_write_query(q):
+            note_write(self._name)
+        return result
+
+    def __getattr__(self, attr):
+        return getattr(self._graph, attr)
+
 
 class GraphService:
     def __init__(self):
@@ -25,6 +60,9 @@ class GraphService:
         self._vector_service = None
         # Keyed by (graph_name, name, entity_type) for multi-tenant safety
         self._resolution_cache: dict[tuple[str, str, str], str] = {}
+        # Pending Item.last_used_at touches, keyed by graph name; flushed in batches
+        self._touch_pending: dict[str, set[str]] = {}
+        self._touch_task: asyncio.Task | None = None
 
     def set_vector_service(self, vector_service) -> None:
         """Allow graph service to use vector for idea similarity detection."""
@@ -174,7 +212,7 @@ class GraphService:
 
         # 1. Batch embed all names at once
         names = [name for name, _ in to_resolve]
-        vectors = self._vector_service.embed(names)
+        vectors = await self._vector_service.aembed(names)
         logger.info("Batch entity resolution: embedded %d names in one call", len(names))
 
         # 2. Parallel Qdrant searches
@@ -245,10 +283,7 @@ class GraphService:
                 }
                 points.append(PointStruct(id=str(uuid.uuid4()), vector=vec, payload=payload))
 
-            await self._vector_service._client.upsert(
-                collection_name=self._vector_service._collection(),
-                points=points,
-            )
+            await self._vector_service.upsert_points(points)
             logger.info("Batch registered %d new entity names", len(new_names))
 
         return {p: self._resolution_cache.get((gn, p[0], p[1]), p[0]) for p in pairs}
@@ -261,23 +296,37 @@ class GraphService:
         """Return the FalkorDB graph handle for the current context."""
         gn = self._current_graph_name()
         if gn not in self._graph_cache:
-            self._graph_cache[gn] = self._db.select_graph(gn)
+            self._graph_cache[gn] = self._select_graph(gn)
         return self._graph_cache[gn]
 
+    def _select_graph(self, graph_name: str):
+        graph = self._db.select_graph(graph_name)
+        # Write tracking only matters to the response cache; skip the check when it's off
+        return _TrackedGraph(graph, graph_name) if settings.response_cache_enabled else graph
+
     async def start(self):
         self._pool = BlockingConnectionPool(
             host=settings.falkordb_host,
             port=settings.falkordb_port,
-            max_connections=16,
-            timeout=None,
+            max_connections=settings.falkordb_max_connections,
+            timeout=None,  # block until a connection frees up instead of failing
             decode_responses=True,
         )
         self._db = FalkorDB(connection_pool=self._pool)
-        self._graph = self._db.select_graph(settings.falkordb_graph_name)
+        self._graph = self._select_graph(settings.falkordb_graph_name)
         self._graph_cache[settings.falkordb_graph_name] = self._graph
+        self._touch_task = asyncio.create_task(self._touch_flush_loop())
         logger.info("FalkorDB connected: %s", settings.falkordb_graph_name)
 
     async def stop(self):
+        if self._touch_task:
+            self._touch_task.cancel()
+            try:
+                await self._touch_task
+            except asyncio.CancelledError:
+                pass
+            self._touch_task = None
+            await self._flush_touches()
         if self._pool:
             await self._pool.aclose()
 
@@ -287,7 +336,7 @@ class GraphService:
 
     async def ensure_user_graph(self, graph_name: str) -> None:
         """Create constraints on a user-specific graph (same as start() does for default)."""
-        graph = self._db.select_graph(graph_name)
+        graph = self._select_graph(graph_name)
         self._graph_cache[graph_name] = graph
         logger.info("Ensured user graph: %s", graph_name)
 
@@ -553,6 +602,21 @@ class GraphService:
             return {"error": f"List '{list_name}' not found"}
         return {"status": "added", "list": list_name, "entry": content}
 
+    async def add_list_entries(self, list_name: str, contents: list[str]) -> dict:
+        """Add several entries to a list in one query."""
+        q = """
+        MATCH (l:List {name: $lname})
+        UNWIND $contents AS content
+        CREATE (e:ListEntry {content: content, checked: false, added_at: $now})
+        CREATE (l)-[:HAS_ENTRY]->(e)
+        RETURN count(e)
+        """
+        rows = await self.query(q, {"lname": list_name, "contents": contents, "now": _now()})
+        added = rows[0][0] if rows else 0
+        if not added:
+            return {"error": f"List '{list_name}' not found"}
+        return {"status": "added", "list": list_name, "entries_added": added}
+
     async def check_list_entry(self, list_name: str, content: str, checked: bool = True) -> dict:
         q = """
         MATCH (l:List {name: $lname})-[:HAS_ENTRY]->(e:ListEntry)
@@ -1246,17 +1310,37 @@ class GraphService:
             return None
         return GraphService._ENERGY_ALIASES.get(level.lower().strip(), level.lower().strip())
 
-    async def upsert_task(self, title: str, **props) -> None:
-        if "energy_level" in props and props["energy_level"]:
+    def _task_merge_clause(self, props: dict) -> str:
+        """MERGE of Task `t` by $title with its SET clauses; normalizes props in place.
+
+        Shared by every task upsert so the write paths can't drift apart.
+        """
+        if props.get("energy_level"):
             props["energy_level"] = self._normalize_energy(props["energy_level"])
         props_str = self._build_set_clause(props, var="t")
-        q = f"""
+        return f"""
         MERGE (t:Task {{title: $title}})
         ON CREATE SET t.status = 'todo', t.created_at = $now {props_str}
         ON MATCH SET t.updated_at = $now {props_str}
         """
+
+    async def upsert_task(self, title: str, **props) -> None:
+        q = self._task_merge_clause(props)
         await self._get_graph().query(q, params={"title": title, "now": _now(), **props})
 
+    async def upsert_task_with_project(self, title: str, project: str, **props) -> None:
+        """Upsert a task, its project and the BELONGS_TO edge in one query."""
+        project = await self.resolve_entity_name(project, "Project")
+        q = self._task_merge_clause(props) + """
+        WITH t
+        MERGE (p:Project {name: $project})
+        ON CREATE SET p.created_at = $now
+        MERGE (t)-[:BELONGS_TO]->(p)
+        """
+        await self._get_graph().query(
+            q, params={"title": title, "project": project, "now": _now(), **props},
+        )
+
     async def delete_task(self, title: str) -> dict:
         """Delete a task by title (fuzzy match). Returns deleted title or error."""
         q = """
@@ -2524,12 +2608,7 @@ class GraphService:
 
     async def query_person_context(self, query: str) -> str:
         """Find person by exact name or fuzzy match from query text."""
-        # 1. Try exact match
-        ctx = await self.query_entity_context("Person", "name", query)
-        if ctx:
-            return ctx
-
-        # 2. Extract candidate names: capitalized words (English proper nouns)
+        # Extract candidate names: capitalized words (English proper nouns)
         stop_words = {
             "how", "old", "is", "my", "the", "what", "who", "when", "where",
             "about", "tell", "me", "many", "much", "does", "do", "are", "was",
@@ -2546,21 +2625,34 @@ class GraphService:
         # Also add Arabic tokens (non-ASCII words)
         candidates += [w for w in query.split() if any(ord(c) > 127 for c in w) and len(w) > 1]
 
-        all_parts = []
-        seen_names = set()
-        for candidate in candidates:
-            rows = await self.query(
-                "MATCH (p:Person) WHERE toLower(p.name) CONTAINS toLower($w) RETURN p.name LIMIT 5",
-                {"w": candidate},
+        # 1. Exact match
+        ctx = await self.query_entity_context("Person", "name", query)
+        if ctx:
+            return ctx
+
+        # 2. Fuzzy matches from candidate tokens (lookups run concurrently)
+        candidate_rows = await asyncio.gather(
+            *(
+                self.query(
+                    "MATCH (p:Person) WHERE toLower(p.name) CONTAINS toLower($w) RETURN p.name LIMIT 5",
+                    {"w": candidate},
+                )
+                for candidate in candidates
             )
+        )
+        names = []
+        seen_names = set()
+        for rows in candidate_rows:
             for row in (rows or []):
                 name = row[0]
                 if name in seen_names:
                     continue
                 seen_names.add(name)
-                ctx = await self.query_entity_context("Person", "name", name)
-                if ctx:
-                    all_parts.append(ctx)
+                names.append(name)
+        contexts = await asyncio.gather(
+            *(self.query_entity_context("Person", "name", name) for name in names)
+        )
+        all_parts = [c for c in contexts if c]
         if all_parts:
             return "\n\n".join(all_parts)
 
@@ -2598,7 +2690,7 @@ class GraphService:
 
     async def query_financial_summary(self, detailed: bool = False) -> str:
         parts = []
-        now = datetime.utcnow()
+        now = _now_dt()
         month_start = f"{now.year}-{now.month:02d}-01"
         _, last_day = calendar.monthrange(now.year, now.month)
         month_end = f"{now.year}-{now.month:02d}-{last_day:02d}"
@@ -2707,7 +2799,7 @@ class GraphService:
 
     async def query_spending_alerts(self) -> str:
         """Flag categories where current month spending > 40% above 3-month avg."""
-        now = datetime.utcnow()
+        now = _now_dt()
         _, last_day = calendar.monthrange(now.year, now.month)
         cur_start = f"{now.year}-{now.month:02d}-01"
         cur_end = f"{now.year}-{now.month:02d}-{last_day:02d}"
@@ -3025,6 +3117,22 @@ class GraphService:
 
         return "\n".join(parts) if parts else "No reminders found."
 
+    async def list_reminders(self, status: str = "pending", limit: int = 40) -> list[dict]:
+        """Structured reminder rows (no HA automations), for matching rather than display."""
+        q = """
+        MATCH (r:Reminder {status: $status})
+        WHERE r.is_ha_automation IS NULL OR r.is_ha_automation = false
+        RETURN id(r), r.title, r.due_date, r.reminder_type, r.priority
+        ORDER BY r.due_date
+        LIMIT $limit
+        """
+        rows = await self.query(q, {"status": status, "limit": limit})
+        return [
+            {"id": r[0], "title": r[1], "due_date": r[2], "reminder_type": r[3], "priority": r[4]}
+            for r in rows or []
+            if r[1]
+        ]
+
     @staticmethod
     def _format_reminder_tags(
         reminder_type: str | None, priority: int | None, snooze_count: int | None
@@ -3867,16 +3975,33 @@ class GraphService:
         return [{"name": r[0], "quantity": int(r[1] or 0), "location": r[2]} for r in (rows or [])]
 
     async def _touch_item_last_used(self, name: str) -> None:
-        """Update last_used_at timestamp on an item (fire-and-forget)."""
-        try:
-            q = """
-            MATCH (i:Item)
-            WHERE toLower(i.name) CONTAINS toLower($name)
-            SET i.last_used_at = $now
-            """
-            await self.query(q, {"name": name, "now": _now()})
-        except Exception:
-            pass
+        """Queue a last_used_at touch for an item; written in batches by _touch_flush_loop."""
+        self._touch_pending.setdefault(self._current_graph_name(), set()).add(name)
+
+    async def _touch_flush_loop(self) -> None:
+        while True:
+            await asyncio.sleep(_TOUCH_FLUSH_INTERVAL)
+            await self._flush_touches()
+
+    async def _flush_touches(self) -> None:
+        pending, self._touch_pending = self._touch_pending, {}
+        for graph_name, names in pending.items():
+            try:
+                await self._touch_items_last_used_bulk(graph_name, list(names))
+            except Exception as e:
+                logger.debug("Item last_used_at flush failed for %s: %s", graph_name, e)
+
+    async def _touch_items_last_used_bulk(self, graph_name: str, names: list[str]) -> None:
+        """Set last_used_at on all items matching any of the names, in one query."""
+        if graph_name not in self._graph_cache:
+            self._graph_cache[graph_name] = self._select_graph(graph_name)
+        q = """
+        UNWIND $names AS n
+        MATCH (i:Item)
+        WHERE toLower(i.name) CONTAINS toLower(n)
+        SET i.last_used_at = $now
+        """
+        await self._graph_cache[graph_name].query(q, params={"names": names, "now": _now()})
 
     async def query_unused_items(self, days: int | None = None) -> list[dict]:
         """Find items not used/mentioned for N days."""
@@ -4050,11 +4175,12 @@ class GraphService:
         return "\n".join(parts[:30])
 
 
+_TZ = timezone(timedelta(hours=settings.timezone_offset_hours))
+
+
 def _now() -> str:
-    tz = timezone(timedelta(hours=get_settings().timezone_offset_hours))
-    return datetime.now(tz).isoformat()
+    return datetime.now(_TZ).isoformat()
 
 
 def _now_dt() -> datetime:
-    tz = timezone(timedelta(hours=get_settings().timezone_offset_hours))
-    return datetime.now(tz)
+    return datetime.now(_TZ)
@@ -0,0 +1,25 @@
+"""JSON encode/decode shared by LLM request bodies, tool arguments and NDJSON output."""
+
+import json
+
+import orjson
+
+# U+0085/U+2028/U+2029 are legal unescaped in JSON, but line readers (httpx
+# aiter_lines, requests.iter_lines) split on them and would cut an NDJSON event
+_LINE_SEP_ESCAPES = str.maketrans({"\u0085": "\\u0085", "\u2028": "\\u2028", "\u2029": "\\u2029"})
+
+
+def json_loads(data: str | bytes):
+    """orjson.loads; its JSONDecodeError subclasses json's, so handlers stay the same."""
+    return orjson.loads(data)
+
+
+def json_dumps(obj, sort_keys: bool = False, default=None) -> str:
+    """Compact UTF-8 JSON (ensure_ascii=False equivalent), safe for line-delimited output."""
+    option = orjson.OPT_NON_STR_KEYS | (orjson.OPT_SORT_KEYS if sort_keys else 0)
+    try:
+        text = orjson.dumps(obj, default=default, option=option).decode()
+    except TypeError:
+        # Values orjson can't encode (e.g. ints beyond 64 bits) — let stdlib try
+        text = json.dumps(obj, ensure_ascii=False, sort_keys=sort_keys, default=default)
+    return text.translate(_LINE_SEP_ESCAPES)
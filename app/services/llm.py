@@ -1,8 +1,15 @@
+import asyncio
 import json
 import logging
+import random
+import re
+import time
+from collections import OrderedDict
 from collections.abc import AsyncGenerator
+from contextlib import asynccontextmanager
 
 import httpx
+from pydantic import ValidationError
 
 try:
     from anthropic import AsyncAnthropic
@@ -10,11 +17,14 @@ except ImportError:
     AsyncAnthropic = None
 
 from app.config import get_settings
+from app.models.schemas import CorePreferences, SummaryAndPreferences
 from app.prompts.extract import build_context_enrichment, build_extract
 from app.prompts.extract_specialized import build_specialized_extract
 from app.prompts.file_classify import build_file_classify
 from app.prompts.translate import build_translate_ar_to_en, build_translate_en_to_ar
 from app.prompts.vision import build_vision_analysis
+from app.services.json_codec import json_dumps, json_loads
+from app.services.memory import format_transcript
 
 CORE_MEMORY_SYSTEM = """Extract user preferences and patterns from the conversation.
 Look for:
@@ -34,24 +44,110 @@ Respond in JSON:
 Only include preferences you are confident about. If none found, return {"preferences": {}}
 """
 
+DAILY_SUMMARY_SYSTEM = (
+    "Summarize the following conversation messages into a concise daily summary. "
+    "Focus on key facts, decisions, tasks, and important information. "
+    "If a previous summary is given, return it updated with the new messages. "
+    "Keep it under 500 words. Output only the summary."
+)
+
+SUMMARY_AND_CORE_SYSTEM = """Read the conversation and produce two things in one JSON object:
+
+1. "summary": a concise daily summary. Focus on key facts, decisions, tasks, and
+   important information. Keep it under 500 words. If a previous summary is given,
+   return it updated with the new messages.
+2. "preferences": user preferences and patterns you are confident about —
+   preferred currency, common contacts/people, spending patterns or categories,
+   communication preferences (language mix, formality), recurring topics or interests.
+
+Respond in JSON:
+{
+  "summary": "...",
+  "preferences": {
+    "key": "value"
+  }
+}
+
+If no preferences are found, use "preferences": {}.
+"""
+
 logger = logging.getLogger(__name__)
 
 settings = get_settings()
 
 
+def _with_previous_summary(messages_text: str, previous_summary: str | None) -> str:
+    if not previous_summary:
+        return messages_text
+    return f"Previous summary:\n{previous_summary}\n\nNew messages:\n{messages_text}"
+
+_ARABIC_CHAR_RE = re.compile(r"[\u0600-\u06FF]")
+_TRANSLATE_CACHE_SIZE = 512
+_MSG_JSON_CACHE_SIZE = 32  # concurrent tool loops whose encoded history is kept
+
+_RETRYABLE_STATUS = {429, 502, 503, 504}
+_CHAT_TIMEOUT = httpx.Timeout(120.0, connect=10.0)
+_TOOLS_TIMEOUT = httpx.Timeout(180.0, connect=10.0)
+
+
+class _TokenBucket:
+    """Async token bucket: `rate_per_min` requests/minute with bursts up to the same size."""
+
+    def __init__(self, rate_per_min: int):
+        self._rate = rate_per_min / 60.0
+        self._capacity = float(rate_per_min)
+        self._tokens = self._capacity
+        self._updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self) -> None:
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self._tokens = min(self._capacity, self._tokens + (now - self._updated) * self._rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                await asyncio.sleep((1 - self._tokens) / self._rate)
+
+
+def _is_retryable(exc: Exception, retry_read_timeouts: bool = True) -> bool:
+    if isinstance(exc, httpx.HTTPStatusError):
+        return exc.response.status_code in _RETRYABLE_STATUS
+    if isinstance(exc, httpx.ReadTimeout) and not retry_read_timeouts:
+        return False
+    return isinstance(exc, (httpx.TimeoutException, httpx.TransportError))
+
+
 class LLMService:
     def __init__(self):
         self._vllm_client: httpx.AsyncClient | None = None
         self._anthropic_client = None
         self._anthropic_clients: dict[str, AsyncAnthropic] = {}  # per-user cache
+        self._anthropic_http: httpx.AsyncClient | None = None  # pool shared by all Anthropic clients
+        self._translate_cache: OrderedDict[str, str] = OrderedDict()  # ar->en LRU
+        self._tools_json_cache: dict[int, tuple[list[dict], str]] = {}  # id(tools) -> encoded schemas
+        self._anthropic_tools_cache: dict[int, tuple[list[dict], list[dict]]] = {}  # id(tools) -> converted
+        # id(messages) -> (messages, count, encoded prefix) for append-only tool loops
+        self._msg_json_cache: OrderedDict[int, tuple[list[dict], int, str]] = OrderedDict()
+        self._llm_sem = asyncio.Semaphore(settings.llm_max_concurrent)
+        self._llm_bucket = _TokenBucket(settings.llm_rpm) if settings.llm_rpm > 0 else None
 
     async def start(self):
         self._vllm_client = httpx.AsyncClient(
             base_url=settings.vllm_base_url,
-            timeout=httpx.Timeout(120.0, connect=10.0),
+            timeout=_CHAT_TIMEOUT,
+            limits=httpx.Limits(max_connections=64, max_keepalive_connections=32),
         )
+        if AsyncAnthropic:
+            self._anthropic_http = httpx.AsyncClient(
+                limits=httpx.Limits(max_connections=64, max_keepalive_connections=32),
+            )
         if settings.use_claude_for_chat and settings.anthropic_api_key and AsyncAnthropic:
-            self._anthropic_client = AsyncAnthropic(api_key=settings.anthropic_api_key)
+            self._anthropic_client = AsyncAnthropic(
+                api_key=settings.anthropic_api_key, http_client=self._anthropic_http,
+            )
             logger.info("Claude API enabled for chat (model: %s)", settings.anthropic_model)
 
     def _get_anthropic_client(self):
@@ -60,7 +156,7 @@ class LLMService:
         key = _current_anthropic_key.get()
         if key:
             if key not in self._anthropic_clients:
-                self._anthropic_clients[key] = AsyncAnthropic(api_key=key)
+                self._anthropic_clients[key] = AsyncAnthropic(api_key=key, http_client=self._anthropic_http)
             return self._anthropic_clients[key]
         return self._anthropic_client  # default from settings
 
@@ -73,10 +169,10 @@ class LLMService:
     async def stop(self):
         if self._vllm_client:
             await self._vllm_client.aclose()
-        if self._anthropic_client:
-            await self._anthropic_client.close()
-        for client in self._anthropic_clients.values():
-            await client.close()
+        # Anthropic clients only wrap the shared pool; closing it closes them all
+        if self._anthropic_http:
+            await self._anthropic_http.aclose()
+        self._anthropic_client = None
         self._anthropic_clients.clear()
 
     async def _chat_claude(
@@ -155,14 +251,29 @@ class LLMService:
         if "Qwen3" in settings.vllm_model:
             body["chat_template_kwargs"] = {"enable_thinking": False}
 
-        resp = await self._vllm_client.post("/chat/completions", json=body)
-        resp.raise_for_status()
-        data = resp.json()
+        # chat() serves interactive calls (translate_to_english): keep its 120s
+        # cap and fail on a read timeout instead of stacking retries on it
+        resp = await self._send_vllm(
+            json_dumps(body).encode(), timeout=_CHAT_TIMEOUT, retry_read_timeouts=False,
+        )
+        data = json_loads(resp.content)
         return data["choices"][0]["message"]["content"].strip()
 
     async def translate_to_english(self, text: str) -> str:
+        """Translate Arabic to English. Non-Arabic input is returned as-is; results are LRU-cached."""
+        key = text.strip()
+        if not key or not _ARABIC_CHAR_RE.search(key):
+            return text
+        cached = self._translate_cache.get(key)
+        if cached is not None:
+            self._translate_cache.move_to_end(key)
+            return cached
         messages = build_translate_ar_to_en(text)
-        return await self.chat(messages, max_tokens=1024, temperature=0.1)
+        result = await self.chat(messages, max_tokens=1024, temperature=0.1)
+        self._translate_cache[key] = result
+        if len(self._translate_cache) > _TRANSLATE_CACHE_SIZE:
+            self._translate_cache.popitem(last=False)
+        return result
 
     async def translate_to_arabic(self, text: str) -> str:
         messages = build_translate_en_to_ar(text)
@@ -172,7 +283,7 @@ class LLMService:
         messages = build_extract(text, ner_hints=ner_hints, project_name=project_name, existing_entities=existing_entities)
         raw = await self.chat(messages, max_tokens=2048, temperature=0.1, json_mode=True)
         try:
-            return json.loads(raw)
+            return json_loads(raw)
         except json.JSONDecodeError:
             logger.warning("Failed to parse extract_facts JSON: %s", raw[:200])
             return {"entities": []}
@@ -182,26 +293,35 @@ class LLMService:
         messages = build_specialized_extract(text, route, ner_hints=ner_hints, conversation_context=conversation_context)
         raw = await self.chat(messages, max_tokens=2048, temperature=0.1, json_mode=True)
         try:
-            return json.loads(raw)
+            return json_loads(raw)
         except json.JSONDecodeError:
             logger.warning("Failed to parse extract_facts_specialized JSON: %s", raw[:200])
             return {"entities": []}
 
+    async def translate_and_extract(
+        self, text: str, route: str, ner_hints: str = "", allowed_types: list[str] | None = None,
+    ) -> dict:
+        """Specialized extraction straight from Arabic — one LLM call instead of translate + extract."""
+        messages = build_specialized_extract(
+            text, route, ner_hints=ner_hints,
+            arabic_input=bool(_ARABIC_CHAR_RE.search(text)), allowed_types=allowed_types,
+        )
+        raw = await self.chat(messages, max_tokens=2048, temperature=0.1, json_mode=True)
+        try:
+            return json_loads(raw)
+        except json.JSONDecodeError:
+            logger.warning("Failed to parse translate_and_extract JSON: %s", raw[:200])
+            return {"entities": []}
+
     async def add_context_to_chunk(self, chunk: str, full_document: str) -> str:
         messages = build_context_enrichment(chunk, full_document)
         return await self.chat(messages, max_tokens=512, temperature=0.1)
 
-    async def summarize_daily(self, messages_text: str) -> str:
+    async def summarize_daily(self, messages_text: str, previous_summary: str | None = None) -> str:
+        """Daily summary; with previous_summary the model folds the new messages into it."""
         messages = [
-            {
-                "role": "system",
-                "content": (
-                    "Summarize the following conversation messages into a concise daily summary. "
-                    "Focus on key facts, decisions, tasks, and important information. "
-                    "Keep it under 500 words. Output only the summary."
-                ),
-            },
-            {"role": "user", "content": messages_text},
+            {"role": "system", "content": DAILY_SUMMARY_SYSTEM},
+            {"role": "user", "content": _with_previous_summary(messages_text, previous_summary)},
         ]
         return await self.chat(messages, max_tokens=1024, temperature=0.3)
 
@@ -263,7 +383,7 @@ class LLMService:
                     max_tokens=256,
                 )
                 try:
-                    return json.loads(raw)
+                    return json_loads(raw)
                 except json.JSONDecodeError:
                     logger.warning("Claude classify_file JSON parse failed: %s", raw[:200])
             except Exception as e:
@@ -273,7 +393,7 @@ class LLMService:
         messages = build_file_classify(image_b64, mime_type)
         raw = await self.chat(messages, max_tokens=256, temperature=0.1, json_mode=True)
         try:
-            return json.loads(raw)
+            return json_loads(raw)
         except json.JSONDecodeError:
             logger.warning("Failed to parse classify_file JSON: %s", raw[:200])
             return {"file_type": "info_image", "confidence": 0.0, "brief_description": ""}
@@ -292,7 +412,7 @@ class LLMService:
                     VISION_ANALYSIS_SYSTEM, prompt_text, image_b64, mime_type,
                 )
                 try:
-                    return json.loads(raw)
+                    return json_loads(raw)
                 except json.JSONDecodeError:
                     logger.warning("Claude analyze_image JSON parse failed: %s", raw[:200])
             except Exception as e:
@@ -302,7 +422,7 @@ class LLMService:
         messages = build_vision_analysis(image_b64, file_type, mime_type, user_context)
         raw = await self.chat(messages, max_tokens=2048, temperature=0.1, json_mode=True)
         try:
-            return json.loads(raw)
+            return json_loads(raw)
         except json.JSONDecodeError:
             logger.warning("Failed to parse analyze_image JSON: %s", raw[:200])
             return {"error": "Failed to parse analysis", "raw": raw[:500]}
@@ -315,11 +435,30 @@ class LLMService:
         ]
         raw = await self.chat(messages, max_tokens=512, temperature=0.1, json_mode=True)
         try:
-            return json.loads(raw)
-        except json.JSONDecodeError:
-            logger.warning("Failed to parse core_preferences JSON: %s", raw[:200])
+            return CorePreferences.model_validate_json(raw).model_dump()
+        except ValidationError as e:
+            logger.warning("Invalid core_preferences JSON (%d errors): %s", e.error_count(), raw[:200])
             return {"preferences": {}}
 
+    async def summarize_and_extract(self, messages_text: str, previous_summary: str | None = None) -> dict:
+        """Daily summary + core preferences in one call: {"summary": str, "preferences": dict}."""
+        messages = [
+            {"role": "system", "content": SUMMARY_AND_CORE_SYSTEM},
+            {"role": "user", "content": _with_previous_summary(messages_text, previous_summary)},
+        ]
+        raw = await self.chat(messages, max_tokens=1536, temperature=0.2, json_mode=True)
+        try:
+            return SummaryAndPreferences.model_validate_json(raw).model_dump()
+        except ValidationError as e:
+            logger.warning("Invalid summarize_and_extract JSON (%d errors): %s", e.error_count(), raw[:200])
+            # Keep the summary even when the rest of the payload is unusable
+            try:
+                data = json_loads(raw)
+            except json.JSONDecodeError:
+                data = None
+            summary = data.get("summary") if isinstance(data, dict) else None
+            return {"summary": summary if isinstance(summary, str) else "", "preferences": {}}
+
     # --- Tool Calling ---
 
     @staticmethod
@@ -343,11 +482,11 @@ class LLMService:
         seen = set()
         for m in matches:
             try:
-                parsed = json.loads(m)
+                parsed = json_loads(m)
                 name = parsed.get("name", "")
                 args = parsed.get("arguments", {})
                 # Dedup — models sometimes repeat the same call
-                dedup_key = f"{name}:{json.dumps(args, sort_keys=True)}"
+                dedup_key = f"{name}:{json_dumps(args, sort_keys=True)}"
                 if dedup_key in seen:
                     continue
                 seen.add(dedup_key)
@@ -356,7 +495,7 @@ class LLMService:
                     "type": "function",
                     "function": {
                         "name": name,
-                        "arguments": json.dumps(args, ensure_ascii=False),
+                        "arguments": json_dumps(args),
                     },
                 })
             except json.JSONDecodeError:
@@ -407,7 +546,7 @@ class LLMService:
                     fn = tc.get("function", {})
                     raw_args = fn.get("arguments", "{}")
                     try:
-                        input_data = json.loads(raw_args) if isinstance(raw_args, str) and raw_args.strip() else {}
+                        input_data = json_loads(raw_args) if isinstance(raw_args, str) and raw_args.strip() else {}
                     except json.JSONDecodeError:
                         input_data = {}
                     content_blocks.append({
@@ -454,7 +593,12 @@ class LLMService:
 
     @staticmethod
     def _convert_tools_to_anthropic(tools: list[dict]) -> list[dict]:
-        """Convert OpenAI-format tool definitions to Anthropic format."""
+        """Convert OpenAI-format tool definitions to Anthropic format.
+
+        The last tool carries a cache breakpoint: tools precede the system prompt,
+        which embeds the current minute, so without it the schemas would be
+        re-processed whenever the system prompt changes.
+        """
         result = []
         for tool in tools:
             fn = tool.get("function", {})
@@ -463,8 +607,19 @@ class LLMService:
                 "description": fn.get("description", ""),
                 "input_schema": fn.get("parameters", {"type": "object", "properties": {}}),
             })
+        if result:
+            result[-1]["cache_control"] = {"type": "ephemeral"}
         return result
 
+    def _anthropic_tools(self, tools: list[dict]) -> list[dict]:
+        """Converted tool schemas, memoized per tools object (TOOLS is a module constant)."""
+        hit = self._anthropic_tools_cache.get(id(tools))
+        if hit is not None and hit[0] is tools:
+            return hit[1]
+        converted = self._convert_tools_to_anthropic(tools)
+        self._anthropic_tools_cache[id(tools)] = (tools, converted)
+        return converted
+
     @staticmethod
     def _convert_anthropic_response(response) -> dict:
         """Convert Anthropic response to OpenAI-format message dict."""
@@ -481,7 +636,7 @@ class LLMService:
                     "type": "function",
                     "function": {
                         "name": block.name,
-                        "arguments": json.dumps(block.input, ensure_ascii=False),
+                        "arguments": json_dumps(block.input),
                     },
                 })
 
@@ -493,6 +648,83 @@ class LLMService:
 
     # --- Tool Calling: dual backend ---
 
+    def _tools_json(self, tools: list[dict]) -> str:
+        """Encode tool schemas once per tools object (TOOLS is a module constant)."""
+        hit = self._tools_json_cache.get(id(tools))
+        if hit is not None and hit[0] is tools:
+            return hit[1]
+        encoded = json_dumps(tools)
+        self._tools_json_cache[id(tools)] = (tools, encoded)
+        return encoded
+
+    def _messages_json(self, messages: list[dict]) -> str:
+        """Encode a messages array, reusing the prefix encoded on the previous call.
+
+        The tool loop only appends to its messages list between iterations, so
+        system prompt + history are encoded once and each call adds the delta.
+        """
+        key = id(messages)
+        hit = self._msg_json_cache.get(key)
+        if hit is not None and hit[0] is messages and hit[1] <= len(messages):
+            _, n, prefix = hit
+        else:
+            n, prefix = 0, "["
+        delta = messages[n:]
+        if delta:
+            sep = ", " if n else ""
+            prefix += sep + ", ".join(json_dumps(m) for m in delta)
+        self._msg_json_cache[key] = (messages, len(messages), prefix)
+        self._msg_json_cache.move_to_end(key)
+        if len(self._msg_json_cache) > _MSG_JSON_CACHE_SIZE:
+            self._msg_json_cache.popitem(last=False)
+        return prefix + "]"
+
+    def _encode_tools_body(self, body: dict, messages: list[dict], tools: list[dict]) -> bytes:
+        """Serialize a vLLM request body, splicing in encoded messages and tool schemas."""
+        head = json_dumps(body)
+        return (
+            f'{head[:-1]}, "messages": {self._messages_json(messages)}, '
+            f'"tools": {self._tools_json(tools)}}}'
+        ).encode()
+
+    @asynccontextmanager
+    async def _llm_slot(self):
+        """Pace and cap tool-calling LLM requests (token bucket + concurrency limit)."""
+        if self._llm_bucket:
+            await self._llm_bucket.acquire()
+        async with self._llm_sem:
+            yield
+
+    async def _send_vllm(
+        self,
+        body: bytes,
+        stream: bool = False,
+        timeout: httpx.Timeout = _TOOLS_TIMEOUT,
+        retry_read_timeouts: bool = True,
+    ) -> httpx.Response:
+        """POST /chat/completions, retrying transient failures with jittered backoff."""
+        for attempt in range(settings.llm_max_retries + 1):
+            request = self._vllm_client.build_request(
+                "POST", "/chat/completions",
+                content=body,
+                headers={"Content-Type": "application/json"},
+                timeout=timeout,
+            )
+            try:
+                resp = await self._vllm_client.send(request, stream=stream)
+                try:
+                    resp.raise_for_status()
+                except httpx.HTTPStatusError:
+                    await resp.aclose()
+                    raise
+                return resp
+            except Exception as e:
+                if attempt >= settings.llm_max_retries or not _is_retryable(e, retry_read_timeouts):
+                    raise
+                delay = 2 ** attempt + random.random()
+                logger.warning("vLLM request failed (%s), retrying in %.1fs", e, delay)
+                await asyncio.sleep(delay)
+
     async def _chat_with_tools_vllm(
         self,
         messages: list[dict],
@@ -502,20 +734,14 @@ class LLMService:
     ) -> dict:
         body = {
             "model": settings.vllm_model,
-            "messages": messages,
-            "tools": tools,
             "max_tokens": max_tokens,
             "temperature": temperature,
         }
         if "Qwen3" in settings.vllm_model:
             body["chat_template_kwargs"] = {"enable_thinking": False}
 
-        resp = await self._vllm_client.post(
-            "/chat/completions", json=body,
-            timeout=httpx.Timeout(180.0, connect=10.0),
-        )
-        resp.raise_for_status()
-        data = resp.json()
+        resp = await self._send_vllm(self._encode_tools_body(body, messages, tools))
+        data = json_loads(resp.content)
         msg = data["choices"][0]["message"]
 
         if not msg.get("tool_calls") and msg.get("content"):
@@ -533,7 +759,7 @@ class LLMService:
         temperature: float,
     ) -> dict:
         system_content, anthropic_messages = self._convert_messages_to_anthropic(messages)
-        anthropic_tools = self._convert_tools_to_anthropic(tools)
+        anthropic_tools = self._anthropic_tools(tools)
 
         client = self._get_anthropic_client()
         response = await client.messages.create(
@@ -560,12 +786,13 @@ class LLMService:
         temperature: float = 0.3,
     ) -> dict:
         """Chat completion with tool calling. Returns OpenAI-format message dict."""
-        if self._get_anthropic_client():
-            try:
-                return await self._chat_with_tools_anthropic(messages, tools, max_tokens, temperature)
-            except Exception as e:
-                logger.error("Claude API failed, falling back to vLLM: %s", e)
-        return await self._chat_with_tools_vllm(messages, tools, max_tokens, temperature)
+        async with self._llm_slot():
+            if self._get_anthropic_client():
+                try:
+                    return await self._chat_with_tools_anthropic(messages, tools, max_tokens, temperature)
+                except Exception as e:
+                    logger.error("Claude API failed, falling back to vLLM: %s", e)
+            return await self._chat_with_tools_vllm(messages, tools, max_tokens, temperature)
 
     async def _stream_vllm(
         self,
@@ -578,8 +805,6 @@ class LLMService:
 
         body = {
             "model": settings.vllm_model,
-            "messages": messages,
-            "tools": tools,
             "max_tokens": max_tokens,
             "temperature": temperature,
             "stream": True,
@@ -591,11 +816,8 @@ class LLMService:
         text_buffer = ""
         mode = None  # None -> "text" | "tools" | "tools_in_text"
 
-        async with self._vllm_client.stream(
-            "POST", "/chat/completions", json=body,
-            timeout=httpx.Timeout(180.0, connect=10.0),
-        ) as resp:
-            resp.raise_for_status()
+        resp = await self._send_vllm(self._encode_tools_body(body, messages, tools), stream=True)
+        try:
             async for line in resp.aiter_lines():
                 if not line.startswith("data: "):
                     continue
@@ -603,7 +825,7 @@ class LLMService:
                 if data_str.strip() == "[DONE]":
                     break
                 try:
-                    chunk = json.loads(data_str)
+                    chunk = json_loads(data_str)
                     delta = chunk["choices"][0]["delta"]
                 except (json.JSONDecodeError, KeyError, IndexError):
                     continue
@@ -649,6 +871,8 @@ class LLMService:
                     yield {"type": "token", "content": content}
                 elif mode == "tools_in_text":
                     text_buffer += content
+        finally:
+            await resp.aclose()
 
         if mode is None and text_buffer:
             if "<tool_call>" in text_buffer:
@@ -675,7 +899,7 @@ class LLMService:
         temperature: float,
     ) -> AsyncGenerator[dict, None]:
         system_content, anthropic_messages = self._convert_messages_to_anthropic(messages)
-        anthropic_tools = self._convert_tools_to_anthropic(tools)
+        anthropic_tools = self._anthropic_tools(tools)
 
         tool_calls_acc: dict[int, dict] = {}
         client = self._get_anthropic_client()
@@ -724,19 +948,20 @@ class LLMService:
         - {"type": "token", "content": "..."} for text chunks
         - {"type": "tool_calls", "calls": [...]} for collected tool calls (once, at end)
         """
-        if self._get_anthropic_client():
-            started = False
-            try:
-                async for chunk in self._stream_anthropic(messages, tools, max_tokens, temperature):
-                    started = True
-                    yield chunk
-                return
-            except Exception as e:
-                logger.error("Claude streaming failed, falling back to vLLM: %s", e)
-                if started:
+        async with self._llm_slot():
+            if self._get_anthropic_client():
+                started = False
+                try:
+                    async for chunk in self._stream_anthropic(messages, tools, max_tokens, temperature):
+                        started = True
+                        yield chunk
                     return
-        async for chunk in self._stream_vllm(messages, tools, max_tokens, temperature):
-            yield chunk
+                except Exception as e:
+                    logger.error("Claude streaming failed, falling back to vLLM: %s", e)
+                    if started:
+                        return
+            async for chunk in self._stream_vllm(messages, tools, max_tokens, temperature):
+                yield chunk
 
     # --- Streaming (Phase 11) ---
 
@@ -764,7 +989,7 @@ class LLMService:
                 if data_str.strip() == "[DONE]":
                     break
                 try:
-                    chunk = json.loads(data_str)
+                    chunk = json_loads(data_str)
                     delta = chunk["choices"][0]["delta"].get("content", "")
                     if delta:
                         yield delta
@@ -774,10 +999,7 @@ class LLMService:
     # --- Conversation Summarization (Phase 11) ---
 
     async def summarize_conversation(self, messages: list[dict]) -> str:
-        formatted = "\n".join(
-            f"{'User' if m['role'] == 'user' else 'Assistant'}: {m['content']}"
-            for m in messages
-        )
+        formatted = format_transcript(messages)
         prompt_messages = [
             {
                 "role": "system",
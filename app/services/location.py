@@ -15,6 +15,8 @@ from app.config import get_settings
 logger = logging.getLogger(__name__)
 settings = get_settings()
 
+_TZ = timezone(timedelta(hours=settings.timezone_offset_hours))
+
 # ---------------------------------------------------------------------------
 # POI type map: Arabic label → OSM tag patterns
 # ---------------------------------------------------------------------------
@@ -75,8 +77,7 @@ class LocationService:
 
     async def update_current_position(self, lat: float, lon: float) -> None:
         """Store current position + append to history."""
-        tz = timezone(timedelta(hours=settings.timezone_offset_hours))
-        now = datetime.now(tz).isoformat()
+        now = datetime.now(_TZ).isoformat()
         await self._redis.hset("location:current", mapping={
             "lat": str(lat), "lon": str(lon), "updated_at": now,
         })
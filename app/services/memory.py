@@ -1,6 +1,7 @@
 import json
 import logging
 from datetime import date
+from io import StringIO
 
 import redis.asyncio as aioredis
 
@@ -11,6 +12,19 @@ logger = logging.getLogger(__name__)
 
 settings = get_settings()
 
+_TRANSCRIPT_PREFIX = {"user": "User: "}  # every other role renders as Assistant
+
+
+def format_transcript(messages: list[dict]) -> str:
+    """Render working-memory messages as 'User: …' / 'Assistant: …' lines."""
+    buf = StringIO()
+    for i, m in enumerate(messages):
+        if i:
+            buf.write("\n")
+        buf.write(_TRANSCRIPT_PREFIX.get(m.get("role"), "Assistant: "))
+        buf.write(str(m.get("content") or ""))  # tool-call turns have content=None
+    return buf.getvalue()
+
 
 class MemoryService:
     """Redis 3-layer memory system.
@@ -62,6 +76,28 @@ class MemoryService:
         await self._redis.ltrim(key, -settings.working_memory_size * 2, -1)
         await self._redis.expire(key, 86400)
 
+    async def record_exchange(
+        self, session_id: str, user_msg: str, turns: list[dict], reply: str,
+    ) -> int:
+        """Push a full exchange and bump the message counter in one round-trip.
+
+        Same writes as push_message/push_raw/increment_message_count, pipelined.
+        Returns the new message count.
+        """
+        key = self._working_key(session_id)
+        count_key = self._msg_count_key(session_id)
+        entries = [json.dumps({"role": "user", "content": user_msg})]
+        entries.extend(json.dumps(t, ensure_ascii=False) for t in turns)
+        entries.append(json.dumps({"role": "assistant", "content": reply}))
+        async with self._redis.pipeline(transaction=False) as pipe:
+            pipe.rpush(key, *entries)
+            pipe.ltrim(key, -settings.working_memory_size * 2, -1)
+            pipe.expire(key, 86400)
+            pipe.incr(count_key)
+            pipe.expire(count_key, 86400)
+            results = await pipe.execute()
+        return results[3]
+
     async def get_working_memory(self, session_id: str) -> list[dict]:
         key = self._working_key(session_id)
         raw_messages = await self._redis.lrange(key, 0, -1)
@@ -81,6 +117,18 @@ class MemoryService:
     async def get_daily_summary(self, day: date | None = None) -> str | None:
         return await self._redis.get(self._daily_key(day))
 
+    def _summary_mark_key(self, session_id: str) -> str:
+        return self._prefixed(f"summary_mark:{session_id}")
+
+    async def get_summary_mark(self, session_id: str) -> int:
+        """Message count when this session was last folded into the daily summary (0 = never)."""
+        raw = await self._redis.get(self._summary_mark_key(session_id))
+        return int(raw) if raw else 0
+
+    async def set_summary_mark(self, session_id: str, msg_count: int) -> None:
+        # Same lifetime as the message counter it refers to
+        await self._redis.set(self._summary_mark_key(session_id), msg_count, ex=86400)
+
     # --- Layer 3: Core Memory (permanent) ---
 
     CORE_KEY = "core_memory"
@@ -91,6 +139,11 @@ class MemoryService:
     async def set_core_memory(self, field: str, value: str) -> None:
         await self._redis.hset(self._core_key(), field, value)
 
+    async def set_core_memory_many(self, fields: dict[str, str]) -> None:
+        """Set several core-memory fields with one HSET."""
+        if fields:
+            await self._redis.hset(self._core_key(), mapping=fields)
+
     async def get_core_memory(self, field: str) -> str | None:
         return await self._redis.hget(self._core_key(), field)
 
@@ -0,0 +1,178 @@
+"""Semantic cache for read-only tool-calling turns.
+
+Maps (user, local day, query embedding) → final reply, across sessions.
+Only turns that called tools and none of them writes are stored. Entries are
+dropped whenever the user's data changes: graph/vector writes call
+note_write() for the tenant they write to, whatever the entry point (tools,
+routers, scheduler, uploads, backups). Short, referential or
+parameter-mismatched queries never hit. In-process, bounded and TTL'd —
+entries are cheap to lose.
+"""
+
+import logging
+import re
+import time
+from datetime import datetime, timedelta, timezone
+
+import numpy as np
+
+from app.config import get_settings
+from app.middleware.auth import _current_graph_name
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+# user (graph name) -> write generation; bumped by note_write()
+_generations: dict[str, int] = {}
+
+# Tokens that parameterize an otherwise identical query ("expenses in January"
+# vs "... February"): cached replies must match them exactly
+_PARAM_WORDS = frozenset({
+    "january", "february", "march", "april", "may", "june", "july", "august",
+    "september", "october", "november", "december",
+    "يناير", "فبراير", "مارس", "أبريل", "ابريل", "مايو", "يونيو", "يوليو",
+    "أغسطس", "اغسطس", "سبتمبر", "أكتوبر", "اكتوبر", "نوفمبر", "ديسمبر",
+    "sunday", "monday", "tuesday", "wednesday", "thursday", "friday", "saturday",
+    "الأحد", "الاحد", "الاثنين", "الإثنين", "الثلاثاء", "الأربعاء", "الاربعاء",
+    "الخميس", "الجمعة", "السبت",
+    "today", "yesterday", "tomorrow", "week", "month", "year", "last", "next", "this",
+    "اليوم", "أمس", "امس", "بكرة", "بكره", "غدا", "غداً", "الأسبوع", "الاسبوع",
+    "الشهر", "السنة", "الماضي", "الجاي", "القادم",
+})
+# Follow-ups that lean on earlier turns ("and that one?", "نفس الشي") — never cached
+_REFERENTIAL_WORDS = frozenset({
+    "it", "that", "this", "those", "these", "them", "same", "other", "again",
+    "هذا", "هذي", "هذه", "ذا", "ذي", "ذلك", "هذاك", "هذيك", "نفس", "الثاني", "الثانية",
+    "برضو", "كمان",
+})
+_WORD_RE = re.compile(r"\w+")
+_TZ = timezone(timedelta(hours=settings.timezone_offset_hours))
+
+
+def _user_key() -> str:
+    return _current_graph_name.get() or settings.falkordb_graph_name
+
+
+def note_write(user_key: str | None = None) -> None:
+    """Invalidate cached replies for a user (default: the current one) after a data write."""
+    key = user_key or _user_key()
+    _generations[key] = _generations.get(key, 0) + 1
+
+
+def query_params(text: str) -> frozenset[str]:
+    """Numbers and date words in a query (Arabic ب/ل/و/ف prefixes stripped)."""
+    params = set()
+    for tok in _WORD_RE.findall(text.lower()):
+        if tok.isdecimal():  # not isdigit(): "10²" would pass it and break int()
+            params.add(str(int(tok)))  # Arabic-Indic digits normalize too
+            continue
+        for cand in (tok, tok[1:], tok[2:]):
+            if cand in _PARAM_WORDS:
+                params.add(cand)
+                break
+    return frozenset(params)
+
+
+def is_cacheable(text: str) -> bool:
+    """Self-contained questions only: short or referential messages lean on context."""
+    text = text.strip()
+    if len(text) < settings.response_cache_min_chars or len(text.split()) < 3:
+        return False
+    return _REFERENTIAL_WORDS.isdisjoint(_WORD_RE.findall(text.lower()))
+
+
+class CacheProbe:
+    """Everything a lookup/store needs for one turn, captured before tools run."""
+    __slots__ = ("vec", "key", "params", "generation")
+
+    def __init__(self, vec: np.ndarray, params: frozenset[str]):
+        user = _user_key()
+        self.vec = vec
+        # Day-scoped so "today"/"this week" replies don't outlive the date they answered
+        self.key = (user, datetime.now(_TZ).date().isoformat())
+        self.params = params
+        self.generation = _generations.get(user, 0)
+
+
+class _UserEntries:
+    __slots__ = ("vecs", "replies", "stamps", "params", "generation")
+
+    def __init__(self, dim: int, generation: int):
+        self.vecs = np.empty((0, dim), dtype=np.float32)
+        self.replies: list[str] = []
+        self.stamps: list[float] = []
+        self.params: list[frozenset[str]] = []
+        self.generation = generation
+
+
+class SemanticResponseCache:
+    def __init__(self, vector):
+        self.vector = vector
+        self._users: dict[tuple[str, str], _UserEntries] = {}
+
+    async def embed(self, query: str) -> np.ndarray:
+        vecs = await self.vector.aembed_array([query])
+        return np.asarray(vecs[0], dtype=np.float32)
+
+    def lookup(self, probe: CacheProbe) -> str | None:
+        entries = self._users.get(probe.key)
+        if entries is None:
+            return None
+        if entries.generation != probe.generation:
+            del self._users[probe.key]
+            return None
+        self._expire(entries)
+        if not entries.replies:
+            return None
+        scores = entries.vecs @ probe.vec
+        for idx in np.argsort(-scores):
+            score = float(scores[idx])
+            if score < settings.response_cache_threshold:
+                break
+            if entries.params[idx] == probe.params:
+                logger.info("Response cache hit (score=%.3f)", score)
+                return entries.replies[idx]
+        return None
+
+    def store(self, probe: CacheProbe, reply: str) -> None:
+        # A write landed while this turn ran: its reply may already be stale
+        if _generations.get(probe.key[0], 0) != probe.generation:
+            return
+        entries = self._users.get(probe.key)
+        if entries is None or entries.generation != probe.generation:
+            entries = self._users[probe.key] = _UserEntries(probe.vec.shape[0], probe.generation)
+        entries.vecs = np.vstack([entries.vecs, probe.vec[None, :]])
+        entries.replies.append(reply)
+        entries.stamps.append(time.monotonic())
+        entries.params.append(probe.params)
+        overflow = len(entries.replies) - settings.response_cache_max_entries
+        if overflow > 0:
+            self._drop_oldest(entries, overflow)
+        self._prune_users()
+
+    def invalidate(self) -> None:
+        """Drop all entries for the current user (called after any write tool)."""
+        note_write()
+
+    def _prune_users(self) -> None:
+        cutoff = time.monotonic() - settings.response_cache_ttl_seconds
+        stale = [k for k, e in self._users.items() if not e.stamps or e.stamps[-1] < cutoff]
+        for k in stale:
+            del self._users[k]
+
+    def _expire(self, entries: _UserEntries) -> None:
+        cutoff = time.monotonic() - settings.response_cache_ttl_seconds
+        stale = 0
+        for ts in entries.stamps:  # stamps are in insertion order
+            if ts >= cutoff:
+                break
+            stale += 1
+        if stale:
+            self._drop_oldest(entries, stale)
+
+    @staticmethod
+    def _drop_oldest(entries: _UserEntries, n: int) -> None:
+        entries.vecs = entries.vecs[n:]
+        del entries.replies[:n]
+        del entries.stamps[:n]
+        del entries.params[:n]
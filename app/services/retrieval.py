@@ -268,6 +268,7 @@ class RetrievalService:
                 })
             source_used = "vector"
 
+        # Graph search only when asked for or when vector+sections came back thin
         if source == "graph" or (source == "auto" and len(results) < 2):
             graph_text = await self.graph.search_nodes(query_en, limit=limit)
             if graph_text:
@@ -5,20 +5,71 @@ response from facts. The model *cannot* lie because it sees the actual outcome.
 """
 
 import asyncio
-import json
 import logging
 import re
+import time
+from collections import OrderedDict
 from datetime import date, datetime, timedelta, timezone
+from functools import lru_cache
 from pathlib import Path
+from types import MappingProxyType
 
 import httpx
+import numpy as np
+from rapidfuzz import fuzz, process, utils as fuzz_utils
 
 from app.config import get_settings
+from app.middleware.auth import _current_graph_name
 from app.prompts.tool_system import build_tool_system_prompt
+from app.services.json_codec import json_dumps, json_loads
+from app.services.memory import format_transcript
+from app.services.response_cache import (
+    CacheProbe, SemanticResponseCache, is_cacheable, query_params,
+)
 
 logger = logging.getLogger(__name__)
 settings = get_settings()
 
+
+def _args_key(args: dict) -> str:
+    """Canonical (key-sorted) encoding of tool arguments, for dedupe/single-flight keys."""
+    return json_dumps(args, sort_keys=True, default=str)
+
+
+_META_LINE = '{"type":"meta","route":"tool_calling"}\n'
+_TOKEN_LINE_PREFIX = '{"type":"token","content":'
+
+
+def _token_line(content: str) -> str:
+    """NDJSON token event; only the payload goes through the encoder."""
+    return _TOKEN_LINE_PREFIX + json_dumps(content) + "}\n"
+
+
+def _parse_tool_args(raw_args) -> dict:
+    """Decode tool-call arguments into a fresh dict the caller owns."""
+    if isinstance(raw_args, dict):
+        return dict(raw_args)  # don't alias the dict kept in the message history
+    if isinstance(raw_args, str) and raw_args.strip():
+        return json_loads(raw_args)
+    return {}
+
+# Lightweight keyword check for storable content (Arabic + English)
+_STORABLE_WORDS = (
+    "يعمل", "يشتغل", "يدرس", "عمره", "ساكن", "متزوج", "عنده", "تخرج", "يحب",
+    "works at", "lives in", "married", "born", "age", "graduated", "likes",
+    "شركة", "جامعة", "مدرسة", "company", "university", "school",
+)
+
+_STORABLE_RE = re.compile("|".join(map(re.escape, _STORABLE_WORDS)), re.IGNORECASE)
+
+
+# Shorter messages rarely carry a storable fact; skip NER + LLM for them
+_AUTO_EXTRACT_MIN_CHARS = 15
+
+
+def _has_storable_keyword(text: str) -> bool:
+    return _STORABLE_RE.search(text) is not None
+
 # ---------------------------------------------------------------------------
 # Tool definitions (OpenAI format)
 # ---------------------------------------------------------------------------
@@ -579,11 +630,73 @@ TOOLS = [
 ]
 
 
-def _now() -> str:
-    tz = timezone(timedelta(hours=settings.timezone_offset_hours))
-    return datetime.now(tz).strftime("%Y-%m-%d %H:%M:%S")
+_TZ = timezone(timedelta(hours=settings.timezone_offset_hours))
+_TZ_OFFSET_S = settings.timezone_offset_hours * 3600
+
+_TOOL_NAMES = frozenset(t["function"]["name"] for t in TOOLS)
+# Accepted argument names per tool, straight from the schemas (handler signatures match)
+_TOOL_PARAMS = {
+    t["function"]["name"]: frozenset(t["function"].get("parameters", {}).get("properties", {}))
+    for t in TOOLS
+}
+
+
+def _props(**fields) -> dict:
+    """Optional handler fields → props dict, dropping None and empty strings (0/False kept)."""
+    return {k: v for k, v in fields.items() if v is not None and v != ""}
 
 
+def _now() -> str:
+    # Stamped on every tool result; time.gmtime + fixed offset skips the datetime object
+    return time.strftime("%Y-%m-%d %H:%M:%S", time.gmtime(time.time() + _TZ_OFFSET_S))
+
+
+# Arabic error messages shared by several tool handlers
+_ERR_PROJECT_NAME = "اسم المشروع مطلوب"
+_ERR_LIST_NAME = "اسم القائمة مطلوب"
+_ERR_TASK_TITLE = "عنوان المهمة مطلوب"
+_ERR_PLACE_NAME = "اسم المكان مطلوب"
+_ERR_ITEM_NAME = "اسم الغرض مطلوب"
+_ERR_PROJECT_SECTION = "اسم المشروع والقسم مطلوبين"
+_ERR_LIST_ENTRY = "اسم القائمة والعنصر مطلوبين"
+_ERR_HA_DISABLED = "Home Assistant غير مفعل"
+_ERR_HA_NO_ACCESS = "ما عندك صلاحية للوصول للأجهزة الذكية"
+
+
+# (tool, action) -> (required args, error) — checked in _execute_tool before dispatch
+_REQUIRED_ARGS: dict[tuple[str, str], tuple[tuple[str, ...], str]] = {
+    ("manage_inventory", "add"): (("name",), _ERR_ITEM_NAME),
+    ("manage_inventory", "move"): (("name", "location"), "اسم الغرض والموقع الجديد مطلوبين"),
+    ("manage_inventory", "use"): (("name",), _ERR_ITEM_NAME),
+
+    ("manage_tasks", "create"): (("title",), _ERR_TASK_TITLE),
+    ("manage_tasks", "update"): (("title",), _ERR_TASK_TITLE),
+    ("manage_tasks", "delete"): (("title",), _ERR_TASK_TITLE),
+
+    ("manage_projects", "get"): (("name",), _ERR_PROJECT_NAME),
+    ("manage_projects", "create"): (("name",), _ERR_PROJECT_NAME),
+    ("manage_projects", "update"): (("name",), _ERR_PROJECT_NAME),
+    ("manage_projects", "delete"): (("name",), _ERR_PROJECT_NAME),
+    ("manage_projects", "focus"): (("name",), _ERR_PROJECT_NAME),
+    ("manage_projects", "add_section"): (("name", "section_name"), _ERR_PROJECT_SECTION),
+    ("manage_projects", "update_section"): (("name", "section_name"), _ERR_PROJECT_SECTION),
+    ("manage_projects", "delete_section"): (("name", "section_name"), _ERR_PROJECT_SECTION),
+    ("manage_projects", "assign_section"): (("name", "section_name", "entity_type", "entity_name"), "اسم المشروع والقسم ونوع واسم العنصر مطلوبين"),
+    ("manage_projects", "set_phase"): (("name", "section_name"), "اسم المشروع والمرحلة مطلوبين"),
+
+    ("manage_lists", "get"): (("name",), _ERR_LIST_NAME),
+    ("manage_lists", "create"): (("name",), _ERR_LIST_NAME),
+    ("manage_lists", "add_entry"): (("name",), _ERR_LIST_NAME),
+    ("manage_lists", "check_entry"): (("name", "entry"), _ERR_LIST_ENTRY),
+    ("manage_lists", "uncheck_entry"): (("name", "entry"), _ERR_LIST_ENTRY),
+    ("manage_lists", "remove_entry"): (("name", "entry"), _ERR_LIST_ENTRY),
+    ("manage_lists", "delete"): (("name",), _ERR_LIST_NAME),
+
+    ("manage_places", "create"): (("name",), _ERR_PLACE_NAME),
+    ("manage_places", "update"): (("name",), _ERR_PLACE_NAME),
+    ("manage_places", "delete"): (("name",), _ERR_PLACE_NAME),
+}
+
 _WEEKDAY_MAP = {
     "monday": 0, "tuesday": 1, "wednesday": 2, "thursday": 3,
     "friday": 4, "saturday": 5, "sunday": 6,
@@ -595,8 +708,7 @@ def _next_weekday(day_name: str, after: date | None = None) -> str:
     target = _WEEKDAY_MAP.get(day_name.lower())
     if target is None:
         return ""
-    tz = timezone(timedelta(hours=settings.timezone_offset_hours))
-    base = after or datetime.now(tz).date()
+    base = after or datetime.now(_TZ).date()
     days_ahead = (target - base.weekday()) % 7
     if days_ahead == 0:
         days_ahead = 7  # next week if today is the target day
@@ -612,34 +724,60 @@ _PRAYER_NAMES = {
     "maghrib": "Maghrib", "isha": "Isha",
 }
 
+_TITLE_VEC_CACHE_SIZE = 2048
+_REMINDER_TITLES_TTL = 30.0  # seconds a tenant's pending-title list is reused by the match fallback
+_FUZZY_TITLE_CUTOFF = 75  # rapidfuzz token_sort_ratio (0-100) accepted without embeddings
+_FUZZY_TITLE_MARGIN = 10  # ...and only when the best title beats the runner-up by this much
+
+# Strip parenthetical decoration the model adds to reminder titles, e.g. "(متأخرة)" "(مكتمل)"
+_PAREN_RE = re.compile(r"\s*\([^)]*\)\s*")
+
+
+@lru_cache(maxsize=512)
+def _clean_query(query: str) -> str:
+    return _PAREN_RE.sub(" ", query).strip()
+
+
 _prayer_cache: dict[str, dict[str, str]] = {}  # {"2026-02-23": {"Fajr": "05:12", ...}}
 
+# Shared keep-alive client for outbound HTTP (prayer API, Telegram); closed in ToolCallingService.stop()
+_http_client: httpx.AsyncClient | None = None
+
+
+def _get_http_client() -> httpx.AsyncClient:
+    global _http_client
+    if _http_client is None or _http_client.is_closed:
+        _http_client = httpx.AsyncClient(
+            timeout=10,
+            limits=httpx.Limits(max_connections=32, max_keepalive_connections=8),
+        )
+    return _http_client
+
 
 async def _get_prayer_time(prayer: str, offset_minutes: int = 0) -> tuple[str, str]:
     """Return (date_str, time_str) for the next occurrence of the prayer.
 
     If today's prayer has passed, returns tomorrow's.
     """
-    tz = timezone(timedelta(hours=settings.timezone_offset_hours))
-    now = datetime.now(tz)
+    now = datetime.now(_TZ)
     today = now.strftime("%Y-%m-%d")
 
     # Fetch & cache
     if today not in _prayer_cache:
         try:
-            async with httpx.AsyncClient(timeout=10, follow_redirects=True) as client:
-                resp = await client.get(
-                    "http://api.aladhan.com/v1/timingsByCity",
-                    params={
-                        "city": settings.prayer_city,
-                        "country": settings.prayer_country,
-                        "method": settings.prayer_method,
-                    },
-                )
-                resp.raise_for_status()
-                timings = resp.json()["data"]["timings"]
-                _prayer_cache.clear()  # keep only today
-                _prayer_cache[today] = {k: v[:5] for k, v in timings.items()}  # "HH:MM"
+            resp = await _get_http_client().get(
+                "http://api.aladhan.com/v1/timingsByCity",
+                params={
+                    "city": settings.prayer_city,
+                    "country": settings.prayer_country,
+                    "method": settings.prayer_method,
+                },
+                follow_redirects=True,
+            )
+            resp.raise_for_status()
+            timings = resp.json()["data"]["timings"]
+            _prayer_cache.clear()  # keep only today
+            _prayer_cache[today] = {k: v[:5] for k, v in timings.items()}  # "HH:MM"
         except Exception as e:
             logger.warning("Prayer API failed: %s", e)
             return today, ""
@@ -662,6 +800,98 @@ async def _get_prayer_time(prayer: str, offset_minutes: int = 0) -> tuple[str, s
     return result_date, prayer_dt.strftime("%H:%M")
 
 
+# ---------------------------------------------------------------------------
+# Fallback reply formatters (used when the LLM times out after tool calls)
+# ---------------------------------------------------------------------------
+
+
+def _fmt_expense(data: dict) -> str:
+    status = data.get("status", "created")
+    if status == "updated":
+        return f"تم تعديل المصروف: {data.get('old_amount', '')} → {data.get('new_amount', '')} ريال"
+    if status == "deleted":
+        return f"تم حذف المصروف: {data.get('description', '')}"
+    return f"تم تسجيل مصروف: {data.get('description', '')} ({data.get('amount', '')} ريال)"
+
+
+def _fmt_projects(data: dict) -> str:
+    if data.get("status") == "focused":
+        return f"تم التركيز على مشروع: {data.get('name', '')}"
+    if data.get("status") == "unfocused":
+        return "تم إلغاء التركيز على المشروع"
+    return data.get("projects", str(data))
+
+
+def _fmt_lists(data: dict) -> str:
+    return data.get("list") or data.get("lists") or str(data)
+
+
+_FALLBACK_FORMATTERS = {
+    "create_reminder": lambda d: f"تم إنشاء تذكير: {d.get('title', '')}",
+    "delete_reminder": lambda d: f"تم حذف تذكير: {d.get('title', '')}",
+    "add_expense": _fmt_expense,
+    "search_reminders": lambda d: d.get("reminders", ""),
+    "get_daily_plan": lambda d: d.get("plan", ""),
+    "search_knowledge": lambda d: d.get("results", ""),
+    "update_reminder": lambda d: f"تم تحديث تذكير: {d.get('title', '')}",
+    "get_expense_report": lambda d: f"إجمالي المصاريف: {d.get('total', 0):.0f} ريال",
+    "get_debt_summary": lambda d: (
+        f"عليك: {d.get('total_i_owe', 0):.0f} ريال | لك: {d.get('total_owed_to_me', 0):.0f} ريال"
+    ),
+    "record_debt": lambda d: f"تم تسجيل دين: {d.get('person', '')} ({d.get('amount', '')} ريال)",
+    "pay_debt": lambda d: f"تم تسجيل سداد: {d.get('person', '')}",
+    "store_note": lambda d: f"تم حفظ الملاحظة ({d.get('entities_saved', 0)} عنصر)",
+    "get_person_info": lambda d: d.get("info", ""),
+    "manage_inventory": lambda d: d.get("results", str(d)),
+    "manage_tasks": lambda d: d.get("tasks", str(d)),
+    "manage_projects": _fmt_projects,
+    "manage_lists": _fmt_lists,
+    "merge_projects": lambda d: (
+        f"تم دمج {d.get('sources_deleted', 0)} مشاريع ونقل {d.get('tasks_moved', 0)} مهام إلى {d.get('target', '')}"
+    ),
+    "get_productivity_stats": str,
+    "send_to_user": lambda d: f"تم إرسال رسالة إلى {d.get('to', '')}",
+}
+
+
+def _format_tool_result(r: dict) -> str:
+    tool = r.get("tool", "")
+    if r.get("success"):
+        fmt = _FALLBACK_FORMATTERS.get(tool)
+        return fmt(r.get("data", {})) if fmt else f"تم تنفيذ {tool}"
+    return f"فشل {tool}: {r.get('error', r.get('data', {}).get('error', ''))}"
+
+
+
+def _last_exchanges(messages: list[dict], n: int) -> list[dict]:
+    """Tail of working memory holding the last n exchanges (each opens with a user turn)."""
+    if n <= 0:
+        return []
+    seen = 0
+    for i in range(len(messages) - 1, -1, -1):
+        if messages[i].get("role") == "user":
+            seen += 1
+            if seen == n:
+                return messages[i:]
+    return messages
+
+
+def _clip_transcript(text: str) -> str:
+    if len(text) <= settings.memory_trigger_max_chars:
+        return text
+    logger.debug(
+        "Periodic memory tasks: transcript truncated %d -> %d chars",
+        len(text), settings.memory_trigger_max_chars,
+    )
+    # Most recent turns carry the most signal
+    return text[-settings.memory_trigger_max_chars:]
+
+
+def _core_pairs(result: dict) -> dict[str, str]:
+    """Non-empty preferences from an extraction result, as str -> str for HSET."""
+    return {str(k): str(v) for k, v in (result.get("preferences") or {}).items() if k and v}
+
+
 # ---------------------------------------------------------------------------
 # Service
 # ---------------------------------------------------------------------------
@@ -680,38 +910,35 @@ class ToolCallingService:
         self.ner = ner
         self.user_registry = user_registry
         self.ha = ha
+        # Reminder title -> normalized embedding, for the delete/update vector fallback
+        self._title_vec_cache: OrderedDict[str, np.ndarray] = OrderedDict()
+        # graph -> (monotonic stamp, pending reminder titles); dropped on reminder writes
+        self._reminder_titles: dict[str, tuple[float, list[str]]] = {}
+        # graph -> bumped on every reminder write; a fetch that raced a write isn't cached
+        self._reminder_titles_gen: dict[str, int] = {}
+        # graph -> (title list, its C-contiguous normalized embedding matrix)
+        self._title_matrix: dict[str, tuple[list[str], np.ndarray]] = {}
+        self._search_sem = asyncio.Semaphore(settings.search_max_concurrency)
+        self._response_cache = SemanticResponseCache(vector) if settings.response_cache_enabled else None
+        # (graph, tool, args) -> in-flight handler task, for coalescing duplicate reads
+        self._inflight: dict[tuple[str, str, str], asyncio.Task] = {}
+        # (graph, session) -> running periodic summary/preference task
+        self._memory_inflight: dict[tuple[str, str], asyncio.Task] = {}
+        # Caps background summary/preference LLM calls so they can't crowd out chat
+        self._memory_llm_sem = asyncio.Semaphore(settings.memory_llm_max_concurrent)
+        # Strong refs to fire-and-forget post_process tasks (the loop only keeps weak ones)
+        self._background: set[asyncio.Task] = set()
+
+        # Bound once per instance; every tool in TOOLS maps to _handle_<name>
+        self._TOOL_HANDLERS = MappingProxyType(
+            {name: getattr(self, f"_handle_{name}") for name in _TOOL_NAMES}
+        )
 
-        self._TOOL_HANDLERS = {
-            "search_reminders": self._handle_search_reminders,
-            "create_reminder": self._handle_create_reminder,
-            "delete_reminder": self._handle_delete_reminder,
-            "add_expense": self._handle_add_expense,
-            "get_daily_plan": self._handle_get_daily_plan,
-            "search_knowledge": self._handle_search_knowledge,
-            # Phase 1
-            "update_reminder": self._handle_update_reminder,
-            "get_expense_report": self._handle_get_expense_report,
-            "get_debt_summary": self._handle_get_debt_summary,
-            "record_debt": self._handle_record_debt,
-            "pay_debt": self._handle_pay_debt,
-            # Phase 2
-            "store_note": self._handle_store_note,
-            "get_person_info": self._handle_get_person_info,
-            # Phase 3
-            "manage_inventory": self._handle_manage_inventory,
-            "manage_tasks": self._handle_manage_tasks,
-            "manage_projects": self._handle_manage_projects,
-            "manage_lists": self._handle_manage_lists,
-            "merge_projects": self._handle_merge_projects,
-            "get_productivity_stats": self._handle_get_productivity_stats,
-            "manage_places": self._handle_manage_places,
-            "retrieve_file": self._handle_retrieve_file,
-            "send_to_user": self._handle_send_to_user,
-            # Phase 26: Home Assistant
-            "control_device": self._handle_control_device,
-            "query_device": self._handle_query_device,
-            "manage_ha_names": self._handle_manage_ha_names,
-        }
+    async def stop(self):
+        global _http_client
+        if _http_client is not None:
+            await _http_client.aclose()
+            _http_client = None
 
     # ------------------------------------------------------------------
     # Tool handlers
@@ -769,21 +996,11 @@ class ToolCallingService:
         # "2026-03-02" + "20:00" → "2026-03-02T20:00"
         if due_date and time and "T" not in due_date:
             due_date = f"{due_date}T{time}"
-        props = {}
-        if due_date:
-            props["due_date"] = due_date
-        if time:
-            props["time"] = time
-        if recurrence:
-            props["recurrence"] = recurrence
-        if priority is not None:
-            props["priority"] = priority
-        if persistent:
-            props["persistent"] = True
-        if location_place:
-            props["location_place"] = location_place
-        if location_type:
-            props["location_type"] = location_type
+        props = _props(
+            due_date=due_date, time=time, recurrence=recurrence, priority=priority,
+            persistent=True if persistent else None,
+            location_place=location_place, location_type=location_type,
+        )
 
         # Home Assistant action (Phase 26) — stored as HA automation, NOT a regular reminder
         if ha_entity_id and ha_action:
@@ -814,12 +1031,9 @@ class ToolCallingService:
         await self.graph.create_reminder(title, **props)
         return {"status": "created", "title": title, **props}
 
-    # Strip parenthetical decoration the model adds, e.g. "(متأخرة)" "(مكتمل)"
-    _PAREN_RE = re.compile(r"\s*\([^)]*\)\s*")
-
     async def _handle_delete_reminder(self, query: str) -> dict:
         # Clean query: strip parenthetical text like (متأخرة)
-        cleaned = self._PAREN_RE.sub(" ", query).strip()
+        cleaned = _clean_query(query)
 
         # Try direct graph matching first (handles same-language matches)
         result = await self.graph.update_reminder_status(cleaned, action="delete")
@@ -832,8 +1046,9 @@ class ToolCallingService:
             if "error" not in result:
                 return result
 
-        # Cross-language fallback: find best match via vector similarity
-        # (handles Arabic query vs English stored title)
+        # Cross-language fallback: find best match via fuzzy/vector similarity
+        # (handles Arabic query vs English stored title). Only run once the direct
+        # attempts miss — it costs a graph read and possibly an embedding.
         best_title = await self._vector_match_reminder(cleaned)
         if best_title:
             result = await self.graph.update_reminder_status(best_title, action="delete")
@@ -842,47 +1057,66 @@ class ToolCallingService:
 
         return {"error": f"No reminder found matching '{query}'"}
 
+    async def _pending_reminder_titles(self) -> list[str]:
+        """Pending reminder titles for the current tenant, reused for _REMINDER_TITLES_TTL."""
+        key = _current_graph_name.get() or settings.falkordb_graph_name
+        hit = self._reminder_titles.get(key)
+        if hit is not None and time.monotonic() - hit[0] < _REMINDER_TITLES_TTL:
+            return hit[1]
+        gen = self._reminder_titles_gen.get(key, 0)
+        reminders = await self.graph.list_reminders(status="pending")
+        titles = [t for r in reminders if (t := r["title"].strip())]
+        if self._reminder_titles_gen.get(key, 0) == gen:
+            self._reminder_titles[key] = (time.monotonic(), titles)
+        return titles
+
     async def _vector_match_reminder(self, query: str) -> str | None:
-        """Find best matching reminder title via vector similarity (cross-language)."""
+        """Find best matching reminder title: fuzzy string match, then vector similarity (cross-language)."""
         try:
-            # Get all pending reminders
-            reminders_text = await self.graph.query_reminders(status="pending")
-            if not reminders_text or reminders_text == "No reminders found.":
-                return None
-
-            # Extract titles from the formatted text
-            titles = []
-            for line in reminders_text.split("\n"):
-                line = line.strip().lstrip("- ")
-                if not line or line.startswith("⚠") or line.startswith("Upcoming") or line.startswith("Snoozed"):
-                    continue
-                # Title is everything before " (due:" or " [priority:"
-                for sep in [" (due:", " [priority:", " [recurring"]:
-                    if sep in line:
-                        line = line[:line.index(sep)]
-                        break
-                if line:
-                    titles.append(line.strip())
-
+            titles = await self._pending_reminder_titles()
             if not titles:
                 return None
 
-            # Embed query + all titles, find best cosine match
-            all_texts = [query] + titles
-            vectors = self.vector.embed(all_texts)
-            query_vec = vectors[0]
-
-            best_score = 0.0
-            best_title = None
-            for i, title in enumerate(titles):
-                # Cosine similarity
-                dot = sum(a * b for a, b in zip(query_vec, vectors[i + 1]))
-                norm_q = sum(a * a for a in query_vec) ** 0.5
-                norm_t = sum(a * a for a in vectors[i + 1]) ** 0.5
-                score = dot / (norm_q * norm_t) if norm_q * norm_t > 0 else 0
-                if score > best_score:
-                    best_score = score
-                    best_title = title
+            # Cheap same-script pass first. token_sort_ratio (not token_set_ratio) so a
+            # short title that's a subset of the query doesn't score 100; ties and
+            # near-ties go to the embedding path instead of picking the first title.
+            ranked = process.extract(
+                query, titles, scorer=fuzz.token_sort_ratio,
+                processor=fuzz_utils.default_process, limit=2,
+            )
+            if ranked and ranked[0][1] >= _FUZZY_TITLE_CUTOFF and (
+                len(ranked) == 1 or ranked[0][1] - ranked[1][1] >= _FUZZY_TITLE_MARGIN
+            ):
+                best, score = ranked[0][0], ranked[0][1]
+                logger.info("Fuzzy matched reminder '%s' (score=%.0f) for query '%s'", best, score, query)
+                return best
+
+            # Embed query + titles not seen before, find best cosine match.
+            # The stacked title matrix is reused while the cached title list is.
+            cache = self._title_vec_cache
+            key = _current_graph_name.get() or settings.falkordb_graph_name
+            stacked = self._title_matrix.get(key)
+            if stacked is not None and stacked[0] is titles:
+                matrix, missing = stacked[1], []
+            else:
+                matrix, missing = None, [t for t in dict.fromkeys(titles) if t not in cache]
+            arr = np.asarray(await self.vector.aembed_array([query] + missing), dtype=np.float32)
+            if arr.size == 0:
+                return None
+            arr /= np.linalg.norm(arr, axis=1, keepdims=True) + 1e-12
+            if matrix is None:
+                for title, vec in zip(missing, arr[1:]):
+                    cache[title] = vec
+                for title in titles:
+                    cache.move_to_end(title)
+                matrix = np.stack([cache[t] for t in titles])
+                self._title_matrix[key] = (titles, matrix)
+                while len(cache) > _TITLE_VEC_CACHE_SIZE:
+                    cache.popitem(last=False)
+            scores = matrix @ arr[0]
+            best_idx = int(scores.argmax())
+            best_score = float(scores[best_idx])
+            best_title = titles[best_idx]
 
             if best_score >= 0.40:
                 logger.info("Vector matched reminder '%s' (score=%.3f) for query '%s'",
@@ -912,15 +1146,7 @@ class ToolCallingService:
             return {"status": "deleted", "description": deleted.get("description", ""), "amount": deleted.get("amount", 0)}
 
         if action == "update":
-            updates: dict = {}
-            if amount is not None:
-                updates["amount"] = amount
-            if category:
-                updates["category"] = category
-            if date:
-                updates["date"] = date
-            if vendor:
-                updates["vendor"] = vendor
+            updates = _props(amount=amount, category=category, date=date, vendor=vendor)
             result = await self.graph.update_expense(
                 match_desc=description, match_vendor=vendor or "", **updates,
             )
@@ -937,13 +1163,7 @@ class ToolCallingService:
         # Default: create
         if amount is None:
             return {"error": "المبلغ مطلوب لإنشاء مصروف جديد"}
-        props = {}
-        if category:
-            props["category"] = category
-        if date:
-            props["date"] = date
-        if vendor:
-            props["vendor"] = vendor
+        props = _props(category=category, date=date, vendor=vendor)
         await self.graph.create_expense(description, amount, **props)
         return {"status": "created", "description": description, "amount": amount, **props}
 
@@ -972,9 +1192,8 @@ class ToolCallingService:
             logger.warning("[cascade] File description update failed: %s", e)
         try:
             # Update Qdrant vector text
-            from qdrant_client import AsyncQdrantClient
             from qdrant_client.models import Filter, FieldCondition, MatchValue
-            client = AsyncQdrantClient(host="localhost", port=6333)
+            client = self.vector._client  # reuse the pooled client from VectorService
             results = await client.scroll(
                 collection_name=self.vector._collection(),
                 scroll_filter=Filter(must=[
@@ -987,13 +1206,8 @@ class ToolCallingService:
                 text = p.payload.get("text", "")
                 new_text = text.replace(old_str, new_str).replace(old_str_plain, new_str_plain)
                 if new_text != text:
-                    await client.set_payload(
-                        collection_name=self.vector._collection(),
-                        payload={"text": new_text},
-                        points=[p.id],
-                    )
+                    await self.vector.set_payload({"text": new_text}, [p.id])
                     logger.info("[cascade] Updated Qdrant text for point %s", p.id)
-            await client.close()
         except Exception as e:
             logger.warning("[cascade] Qdrant text update failed: %s", e)
 
@@ -1001,11 +1215,41 @@ class ToolCallingService:
         text = await self.graph.query_daily_plan()
         return {"plan": text}
 
+    async def _bounded_search(self, label: str, make_coro, default):
+        """Run one search backend under the shared semaphore and timeout; degrade to default.
+
+        make_coro is called only once the semaphore is held, so a task cancelled
+        while queued never leaves an un-awaited coroutine behind.
+        """
+        try:
+            async with self._search_sem:
+                return await asyncio.wait_for(make_coro(), settings.search_backend_timeout)
+        except asyncio.TimeoutError:
+            logger.warning("search_knowledge: %s timed out", label)
+        except Exception as e:
+            logger.warning("search_knowledge: %s failed: %s", label, e)
+        return default
+
     async def _handle_search_knowledge(self, query: str) -> dict:
+        # Each backend is bounded on its own so a slow one doesn't sink the others
+        vector_task = asyncio.create_task(
+            self._bounded_search("vector", lambda: self.vector.search(query, limit=5), []))
+        graph_task = asyncio.create_task(
+            self._bounded_search("graph", lambda: self.graph.search_nodes(query, limit=10), ""))
+        section_task = asyncio.create_task(
+            self._bounded_search("sections", lambda: self.graph.search_sections(query, limit=15), ""))
+
+        min_chars = settings.search_section_early_exit_chars
+        if min_chars:
+            section_results = await section_task
+            if len(section_results) >= min_chars:
+                # Strong direct hit in project sections — skip the rest
+                vector_task.cancel()
+                graph_task.cancel()
+                return {"results": section_results}
+
         vector_results, graph_results, section_results = await asyncio.gather(
-            self.vector.search(query, limit=5),
-            self.graph.search_nodes(query, limit=10),
-            self.graph.search_sections(query, limit=15),
+            vector_task, graph_task, section_task,
         )
         parts = []
         if section_results:
@@ -1029,7 +1273,7 @@ class ToolCallingService:
         prayer: str | None = None,
         location_place: str | None = None, location_type: str | None = None,
     ) -> dict:
-        cleaned = self._PAREN_RE.sub(" ", query).strip()
+        cleaned = _clean_query(query)
 
         if action in ("done", "cancel"):
             # Check if recurring+persistent — "done" means advance to next occurrence, not mark done
@@ -1072,13 +1316,11 @@ class ToolCallingService:
             elif due_date:
                 snooze_until = due_date
             elif time:
-                tz = timezone(timedelta(hours=settings.timezone_offset_hours))
-                today = datetime.now(tz).strftime("%Y-%m-%d")
+                today = datetime.now(_TZ).strftime("%Y-%m-%d")
                 snooze_until = f"{today}T{time}"
             else:
                 # Default: snooze by nag_interval_minutes
-                tz = timezone(timedelta(hours=settings.timezone_offset_hours))
-                snooze_until = (datetime.now(tz) + timedelta(minutes=settings.nag_interval_minutes)).isoformat()
+                snooze_until = (datetime.now(_TZ) + timedelta(minutes=settings.nag_interval_minutes)).isoformat()
             result = await self.graph.update_reminder_status(cleaned, action="snooze", snooze_until=snooze_until)
             if "error" in result:
                 best_title = await self._vector_match_reminder(cleaned)
@@ -1100,7 +1342,12 @@ class ToolCallingService:
                 time = p_time
 
         # action == "update"
-        kwargs = {}
+        kwargs = _props(
+            priority=priority, new_title=new_title,
+            location_place=location_place, location_type=location_type,
+        )
+        if recurrence is not None:
+            kwargs["recurrence"] = recurrence  # "" clears the recurrence
         if due_date:
             kwargs["due_date"] = due_date
         if time:
@@ -1117,19 +1364,8 @@ class ToolCallingService:
                     kwargs["due_date"] = f"{existing_date}T{time}"
                 else:
                     # No existing date — use today
-                    tz = timezone(timedelta(hours=settings.timezone_offset_hours))
-                    today = datetime.now(tz).strftime("%Y-%m-%d")
+                    today = datetime.now(_TZ).strftime("%Y-%m-%d")
                     kwargs["due_date"] = f"{today}T{time}"
-        if priority is not None:
-            kwargs["priority"] = priority
-        if recurrence is not None:
-            kwargs["recurrence"] = recurrence
-        if new_title:
-            kwargs["new_title"] = new_title
-        if location_place:
-            kwargs["location_place"] = location_place
-        if location_type:
-            kwargs["location_type"] = location_type
         if not kwargs:
             return {"error": "No fields to update"}
 
@@ -1144,8 +1380,7 @@ class ToolCallingService:
         self, month: int | None = None, year: int | None = None,
         compare: bool = False,
     ) -> dict:
-        tz = timezone(timedelta(hours=settings.timezone_offset_hours))
-        now = datetime.now(tz)
+        now = datetime.now(_TZ)
         m = month or now.month
         y = year or now.year
         if compare:
@@ -1159,9 +1394,7 @@ class ToolCallingService:
         self, person: str, amount: float, direction: str,
         reason: str | None = None,
     ) -> dict:
-        props = {}
-        if reason:
-            props["reason"] = reason
+        props = _props(reason=reason)
         await self.graph.upsert_debt(person, amount, direction, **props)
         return {"status": "created", "person": person, "amount": amount, "direction": direction, **props}
 
@@ -1173,6 +1406,10 @@ class ToolCallingService:
     # --- Phase 2 handlers ---
 
     async def _handle_store_note(self, text: str, topic: str | None = None) -> dict:
+        # The original text goes to the vector store regardless of extraction, so
+        # embed + upsert runs alongside translate -> extract -> graph upsert
+        meta = {"source_type": "note", "topic": topic or "general"}
+        vec_task = asyncio.create_task(self.vector.upsert_chunks([text], [meta]))
         try:
             # NER on original text
             ner_hints = ""
@@ -1189,15 +1426,24 @@ class ToolCallingService:
             upserted = 0
             if facts.get("entities"):
                 upserted = await self.graph.upsert_from_facts(facts)
-
-            # Also store in vector
-            meta = {"source_type": "note", "topic": topic or "general"}
-            await self.vector.upsert_chunks([text], [meta])
-
-            return {"status": "stored", "entities_saved": upserted, "text_preview": text[:100]}
         except Exception as e:
-            logger.exception("store_note failed")
-            return {"error": str(e)}
+            logger.exception("store_note extraction failed")
+            (vec_result,) = await asyncio.gather(vec_task, return_exceptions=True)
+            if isinstance(vec_result, BaseException):
+                return {"error": str(e)}
+            # The note itself is saved: say so, or a retry would store it twice
+            return {
+                "status": "stored",
+                "entities_saved": 0,
+                "note": "تم حفظ الملاحظة لكن فشل استخراج المعلومات منها — لا تعِد الحفظ",
+                "text_preview": text[:100],
+            }
+
+        try:
+            await vec_task
+        except Exception:
+            logger.exception("store_note vector upsert failed")
+        return {"status": "stored", "entities_saved": upserted, "text_preview": text[:100]}
 
     async def _handle_get_person_info(self, name: str) -> dict:
         context = await self.graph.query_person_context(name)
@@ -1218,25 +1464,13 @@ class ToolCallingService:
             return await self.graph.query_inventory_report()
 
         if action == "add":
-            if not name:
-                return {"error": "اسم الغرض مطلوب"}
-            props = {}
-            if quantity is not None:
-                props["quantity"] = quantity
-            if location:
-                props["location"] = location
-            if category:
-                props["category"] = category
+            props = _props(quantity=quantity, location=location, category=category)
             return await self.graph.upsert_item(name, **props)
 
         if action == "move":
-            if not name or not location:
-                return {"error": "اسم الغرض والموقع الجديد مطلوبين"}
             return await self.graph.move_item(name, to_location=location)
 
         if action == "use":
-            if not name:
-                return {"error": "اسم الغرض مطلوب"}
             delta = -(quantity or 1)
             return await self.graph.adjust_item_quantity(name, delta)
 
@@ -1252,42 +1486,43 @@ class ToolCallingService:
             return {"tasks": text}
 
         if action == "create":
-            if not title:
-                return {"error": "عنوان المهمة مطلوب"}
-            props = {}
-            if status:
-                props["status"] = status
-            if priority is not None:
-                props["priority"] = priority
-            if due_date:
-                props["due_date"] = due_date
-            await self.graph.upsert_task(title, **props)
+            props = _props(status=status, priority=priority, due_date=due_date)
             if project:
-                await self.graph.upsert_project(project)
-                try:
-                    await self.graph.create_relationship(
-                        "Task", "title", title,
-                        "BELONGS_TO", "Project", "name", project,
-                    )
-                except Exception:
-                    pass
+                await self.graph.upsert_task_with_project(title, project, **props)
+            else:
+                await self.graph.upsert_task(title, **props)
             return {"status": "created", "title": title, "project": project}
 
         if action == "update":
-            if not title:
-                return {"error": "عنوان المهمة مطلوب"}
             return await self.graph.update_task_direct(
                 title, status=status, priority=priority,
                 due_date=due_date, project=project,
             )
 
         if action == "delete":
-            if not title:
-                return {"error": "عنوان المهمة مطلوب"}
             return await self.graph.delete_task(title)
 
         return {"error": f"Unknown action: {action}"}
 
+    async def _write_project(self, write, name: str, aliases: list[str] | None):
+        """Await a project-creating write, then its graph aliases.
+
+        The alias MATCH needs the node to exist, so it follows the write; the
+        vector alias registration is independent and runs alongside both.
+        """
+        async def graph_chain():
+            result = await write
+            if aliases:
+                await self.graph.set_project_aliases(name, aliases)
+            return result
+
+        if not aliases:
+            return await write
+        result, _ = await asyncio.gather(
+            graph_chain(), self.graph.register_aliases_in_vector(name, aliases),
+        )
+        return result
+
     async def _handle_manage_projects(
         self, action: str, name: str | None = None,
         status: str | None = None, description: str | None = None,
@@ -1302,61 +1537,38 @@ class ToolCallingService:
             return {"projects": text}
 
         if action == "get":
-            if not name:
-                return {"error": "اسم المشروع مطلوب"}
             text = await self.graph.query_project_details(name)
             return {"projects": text}
 
         if action == "create":
-            if not name:
-                return {"error": "اسم المشروع مطلوب"}
-            props = {}
-            if status:
-                props["status"] = status
-            if description:
-                props["description"] = description
-            if priority is not None:
-                props["priority"] = priority
+            props = _props(status=status, description=description, priority=priority)
             if with_phases:
-                result = await self.graph.create_project_with_phases(name, **props)
-                if aliases:
-                    await self.graph.set_project_aliases(name, aliases)
-                    await self.graph.register_aliases_in_vector(name, aliases)
+                result = await self._write_project(
+                    self.graph.create_project_with_phases(name, **props), name, aliases,
+                )
                 result["aliases"] = aliases or []
                 return result
-            await self.graph.upsert_project(name, **props)
-            if aliases:
-                await self.graph.set_project_aliases(name, aliases)
-                await self.graph.register_aliases_in_vector(name, aliases)
+            await self._write_project(self.graph.upsert_project(name, **props), name, aliases)
             return {"status": "created", "name": name, "aliases": aliases or [], **props}
 
         if action == "update":
-            if not name:
-                return {"error": "اسم المشروع مطلوب"}
-            props = {}
-            if status:
-                props["status"] = status
-            if description:
-                props["description"] = description
-            if priority is not None:
-                props["priority"] = priority
-            if aliases:
-                await self.graph.set_project_aliases(name, aliases)
-                await self.graph.register_aliases_in_vector(name, aliases)
+            props = _props(status=status, description=description, priority=priority)
             if not props and not aliases:
                 return {"error": "لا توجد حقول للتعديل"}
+            # Existing project: alias and property writes don't depend on each other
+            tasks = []
+            if aliases:
+                tasks.append(self.graph.set_project_aliases(name, aliases))
+                tasks.append(self.graph.register_aliases_in_vector(name, aliases))
             if props:
-                await self.graph.upsert_project(name, **props)
+                tasks.append(self.graph.upsert_project(name, **props))
+            await asyncio.gather(*tasks)
             return {"status": "updated", "name": name, "aliases": aliases or [], **props}
 
         if action == "delete":
-            if not name:
-                return {"error": "اسم المشروع مطلوب"}
             return await self.graph.delete_project(name)
 
         if action == "focus":
-            if not name:
-                return {"error": "اسم المشروع مطلوب"}
             resolved = await self.graph.resolve_entity_name(name, "Project")
             # Verify project exists
             details = await self.graph.query_project_details(resolved)
@@ -1372,40 +1584,20 @@ class ToolCallingService:
             return {"status": "unfocused"}
 
         if action == "add_section":
-            if not name or not section_name:
-                return {"error": "اسم المشروع والقسم مطلوبين"}
-            props = {}
-            if section_type:
-                props["section_type"] = section_type
-            if order is not None:
-                props["order"] = order
+            props = _props(section_type=section_type, order=order)
             return await self.graph.create_section(name, section_name, **props)
 
         if action == "update_section":
-            if not name or not section_name:
-                return {"error": "اسم المشروع والقسم مطلوبين"}
-            props = {}
-            if description:
-                props["description"] = description
-            if status:
-                props["status"] = status
-            if order is not None:
-                props["order"] = order
+            props = _props(description=description, status=status, order=order)
             return await self.graph.update_section(name, section_name, **props)
 
         if action == "delete_section":
-            if not name or not section_name:
-                return {"error": "اسم المشروع والقسم مطلوبين"}
             return await self.graph.delete_section(name, section_name)
 
         if action == "assign_section":
-            if not name or not section_name or not entity_type or not entity_name:
-                return {"error": "اسم المشروع والقسم ونوع واسم العنصر مطلوبين"}
             return await self.graph.assign_to_section(name, section_name, entity_type, entity_name)
 
         if action == "set_phase":
-            if not name or not section_name:
-                return {"error": "اسم المشروع والمرحلة مطلوبين"}
             return await self.graph.set_active_phase(name, section_name)
 
         return {"error": f"Unknown action: {action}"}
@@ -1420,45 +1612,29 @@ class ToolCallingService:
             return {"lists": text}
 
         if action == "get":
-            if not name:
-                return {"error": "اسم القائمة مطلوب"}
             text = await self.graph.query_list(name)
             return {"list": text}
 
         if action == "create":
-            if not name:
-                return {"error": "اسم القائمة مطلوب"}
             return await self.graph.create_list(name, list_type=list_type or "checklist", project_name=project)
 
         if action == "add_entry":
-            if not name:
-                return {"error": "اسم القائمة مطلوب"}
             if entries:
-                for e in entries:
-                    await self.graph.add_list_entry(name, e)
-                return {"status": "added", "list": name, "entries_added": len(entries)}
+                return await self.graph.add_list_entries(name, entries)
             if not entry:
                 return {"error": "محتوى العنصر مطلوب"}
             return await self.graph.add_list_entry(name, entry)
 
         if action == "check_entry":
-            if not name or not entry:
-                return {"error": "اسم القائمة والعنصر مطلوبين"}
             return await self.graph.check_list_entry(name, entry, checked=True)
 
         if action == "uncheck_entry":
-            if not name or not entry:
-                return {"error": "اسم القائمة والعنصر مطلوبين"}
             return await self.graph.check_list_entry(name, entry, checked=False)
 
         if action == "remove_entry":
-            if not name or not entry:
-                return {"error": "اسم القائمة والعنصر مطلوبين"}
             return await self.graph.remove_list_entry(name, entry)
 
         if action == "delete":
-            if not name:
-                return {"error": "اسم القائمة مطلوب"}
             return await self.graph.delete_list(name)
 
         return {"error": f"Unknown action: {action}"}
@@ -1476,9 +1652,11 @@ class ToolCallingService:
             sprints = await self.graph.query_sprints()
             return {"sprints": sprints}
         # overview: combine focus + tasks + projects
-        focus = await self.graph.query_focus_stats()
-        tasks_text = await self.graph.query_active_tasks()
-        projects_text = await self.graph.query_projects_overview()
+        focus, tasks_text, projects_text = await asyncio.gather(
+            self.graph.query_focus_stats(),
+            self.graph.query_active_tasks(),
+            self.graph.query_projects_overview(),
+        )
         return {
             "focus": focus,
             "active_tasks": tasks_text,
@@ -1507,8 +1685,6 @@ class ToolCallingService:
             return {"places": "\n".join(lines)}
 
         if action == "create":
-            if not name:
-                return {"error": "اسم المكان مطلوب"}
             from app.config import get_settings
             r = radius or get_settings().location_default_radius
             await self.graph.create_place(
@@ -1518,23 +1694,11 @@ class ToolCallingService:
             return {"status": "created", "name": name}
 
         if action == "update":
-            if not name:
-                return {"error": "اسم المكان مطلوب"}
-            kwargs = {}
-            if lat:
-                kwargs["lat"] = lat
-            if lon:
-                kwargs["lon"] = lon
-            if radius:
-                kwargs["radius"] = radius
-            if place_type:
-                kwargs["place_type"] = place_type
+            kwargs = _props(lat=lat, lon=lon, radius=radius, place_type=place_type)
             await self.graph.update_place(name, **kwargs)
             return {"status": "updated", "name": name}
 
         if action == "delete":
-            if not name:
-                return {"error": "اسم المكان مطلوب"}
             await self.graph.delete_place(name)
             return {"status": "deleted", "name": name}
 
@@ -1564,9 +1728,8 @@ class ToolCallingService:
         """Send a Telegram message via Bot HTTP API."""
         url = f"https://api.telegram.org/bot{bot_token}/sendMessage"
         try:
-            async with httpx.AsyncClient(timeout=10) as client:
-                resp = await client.post(url, json={"chat_id": chat_id, "text": text})
-                return resp.status_code == 200
+            resp = await _get_http_client().post(url, json={"chat_id": chat_id, "text": text})
+            return resp.status_code == 200
         except Exception as e:
             logger.error("Telegram direct send failed: %s", e)
             return False
@@ -1610,7 +1773,7 @@ class ToolCallingService:
         if self._is_isolated_user():
             return {"error": "ما عندك صلاحية للتحكم بالأجهزة الذكية"}
         if not self.ha:
-            return {"error": "Home Assistant غير مفعل"}
+            return {"error": _ERR_HA_DISABLED}
 
         entity_id = await self.ha.resolve_entity(device)
         if not entity_id:
@@ -1636,9 +1799,9 @@ class ToolCallingService:
     ) -> dict:
         """Query device state, list devices, list/cancel HA automations."""
         if self._is_isolated_user():
-            return {"error": "ما عندك صلاحية للوصول للأجهزة الذكية"}
+            return {"error": _ERR_HA_NO_ACCESS}
         if not self.ha:
-            return {"error": "Home Assistant غير مفعل"}
+            return {"error": _ERR_HA_DISABLED}
 
         # Cancel a scheduled HA automation
         if cancel_automation:
@@ -1683,9 +1846,9 @@ class ToolCallingService:
     ) -> dict:
         """Manage custom Arabic names for HA entities."""
         if self._is_isolated_user():
-            return {"error": "ما عندك صلاحية للوصول للأجهزة الذكية"}
+            return {"error": _ERR_HA_NO_ACCESS}
         if not self.ha:
-            return {"error": "Home Assistant غير مفعل"}
+            return {"error": _ERR_HA_DISABLED}
 
         if action == "list":
             names = await self.ha.get_entity_names()
@@ -1789,21 +1952,90 @@ class ToolCallingService:
 
     _SESSION_AWARE_TOOLS = {"manage_projects"}
 
+    # Read-only tools whose identical concurrent calls share one execution
+    _COALESCED_TOOLS = {
+        "search_reminders", "get_daily_plan", "get_debt_summary", "get_expense_report",
+        "search_knowledge", "get_productivity_stats", "get_person_info",
+    }
+
+    async def _single_flight(self, name: str, handler, arguments: dict):
+        key = (
+            _current_graph_name.get() or settings.falkordb_graph_name,
+            name,
+            _args_key(arguments),
+        )
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.create_task(handler(**arguments))
+            self._inflight[key] = task
+            task.add_done_callback(lambda _t: self._inflight.pop(key, None))
+        # shield: one caller being cancelled must not cancel the shared call
+        return await asyncio.shield(task)
+
     async def _execute_tool(self, name: str, arguments: dict, session_id: str | None = None) -> dict:
-        """Execute a tool and return validated result."""
+        """Execute a tool and return validated result.
+
+        Takes ownership of ``arguments`` (callers pass a fresh dict from
+        _parse_tool_args), so session injection mutates it in place.
+        """
         handler = self._TOOL_HANDLERS.get(name)
         if not handler:
             return {"tool": name, "success": False, "error": f"Unknown tool: {name}", "executed_at": _now()}
         try:
+            allowed = _TOOL_PARAMS[name]
+            if not arguments.keys() <= allowed:
+                logger.debug("Tool %s: dropping unknown args %s", name, sorted(arguments.keys() - allowed))
+                arguments = {k: v for k, v in arguments.items() if k in allowed}
+            required = _REQUIRED_ARGS.get((name, arguments.get("action")))
+            if required and not all(arguments.get(k) for k in required[0]):
+                return {"tool": name, "success": False, "data": {"error": required[1]}, "executed_at": _now()}
             if session_id and name in self._SESSION_AWARE_TOOLS:
-                arguments = {**arguments, "_session_id": session_id}
-            result = await handler(**arguments)
-            success = "error" not in result if isinstance(result, dict) else True
+                arguments["_session_id"] = session_id
+            if name in self._COALESCED_TOOLS:
+                result = await self._single_flight(name, handler, arguments)
+            else:
+                result = await handler(**arguments)
+            success = result.get("error") is None if isinstance(result, dict) else True
+            if self._response_cache and name in self._WRITE_TOOLS:
+                self._response_cache.invalidate()
+            if name in self._REMINDER_WRITE_TOOLS:
+                gn = _current_graph_name.get() or settings.falkordb_graph_name
+                self._reminder_titles.pop(gn, None)
+                self._reminder_titles_gen[gn] = self._reminder_titles_gen.get(gn, 0) + 1
             return {"tool": name, "success": success, "data": result, "executed_at": _now()}
         except Exception as e:
             logger.exception("Tool %s failed", name)
             return {"tool": name, "success": False, "error": str(e), "executed_at": _now()}
 
+    async def _execute_tool_calls(self, parsed_calls: list[tuple[dict, dict]], session_id: str | None) -> list:
+        """Run one turn's tool calls in parallel; results align with parsed_calls.
+
+        Identical read-only calls (same name + args) run once and share the
+        result. Exceptions are returned in place, as gather(return_exceptions=True).
+        """
+        slots: list[int] = []
+        unique: list[tuple[str, dict]] = []
+        seen: dict[tuple[str, str], int] = {}
+        for tc, args in parsed_calls:
+            name = tc["function"]["name"]
+            if name in self._WRITE_TOOLS:
+                slots.append(len(unique))
+                unique.append((name, args))
+                continue
+            key = (name, _args_key(args))
+            idx = seen.get(key)
+            if idx is None:
+                idx = seen[key] = len(unique)
+                unique.append((name, args))
+            slots.append(idx)
+        if len(unique) < len(parsed_calls):
+            logger.info("Deduplicated %d repeated tool call(s)", len(parsed_calls) - len(unique))
+        results = await asyncio.gather(
+            *(self._execute_tool(name, args, session_id=session_id) for name, args in unique),
+            return_exceptions=True,
+        )
+        return [results[i] for i in slots]
+
     # ------------------------------------------------------------------
     # Main chat loop
     # ------------------------------------------------------------------
@@ -1811,80 +2043,49 @@ class ToolCallingService:
     @staticmethod
     def _fallback_reply(tool_results: list[dict]) -> str:
         """Generate a simple Arabic reply from tool results when LLM times out."""
-        parts = []
+        return "\n".join(map(_format_tool_result, tool_results)) or "تم تنفيذ الطلب."
+
+    async def _embed_for_cache(self, message: str):
+        """Query embedding for the response cache; None when off, not cacheable or failing."""
+        if not self._response_cache or not is_cacheable(message):
+            return None
+        try:
+            return await self._response_cache.embed(message)
+        except Exception as e:
+            logger.warning("Response cache embed failed: %s", e)
+            return None
+
+    def _cached_reply(self, query_vec, message: str):
+        """Return (probe, cached_reply) — both None when there's nothing to look up."""
+        if query_vec is None:
+            return None, None
+        probe = CacheProbe(query_vec, query_params(message))
+        return probe, self._response_cache.lookup(probe)
+
+    def _maybe_cache_reply(self, probe: CacheProbe | None, tool_results: list[dict], reply: str) -> None:
+        """Cache only turns backed by successful read-only tools (no attachments)."""
+        if probe is None or not reply or not tool_results:
+            return
         for r in tool_results:
-            tool = r.get("tool", "")
-            if r.get("success"):
-                data = r.get("data", {})
-                if tool == "create_reminder":
-                    parts.append(f"تم إنشاء تذكير: {data.get('title', '')}")
-                elif tool == "delete_reminder":
-                    parts.append(f"تم حذف تذكير: {data.get('title', '')}")
-                elif tool == "add_expense":
-                    status = data.get("status", "created")
-                    if status == "updated":
-                        parts.append(f"تم تعديل المصروف: {data.get('old_amount', '')} → {data.get('new_amount', '')} ريال")
-                    elif status == "deleted":
-                        parts.append(f"تم حذف المصروف: {data.get('description', '')}")
-                    else:
-                        parts.append(f"تم تسجيل مصروف: {data.get('description', '')} ({data.get('amount', '')} ريال)")
-                elif tool == "search_reminders":
-                    parts.append(data.get("reminders", ""))
-                elif tool == "get_daily_plan":
-                    parts.append(data.get("plan", ""))
-                elif tool == "search_knowledge":
-                    parts.append(data.get("results", ""))
-                elif tool == "update_reminder":
-                    parts.append(f"تم تحديث تذكير: {data.get('title', '')}")
-                elif tool == "get_expense_report":
-                    total = data.get("total", 0)
-                    parts.append(f"إجمالي المصاريف: {total:.0f} ريال")
-                elif tool == "get_debt_summary":
-                    parts.append(f"عليك: {data.get('total_i_owe', 0):.0f} ريال | لك: {data.get('total_owed_to_me', 0):.0f} ريال")
-                elif tool == "record_debt":
-                    parts.append(f"تم تسجيل دين: {data.get('person', '')} ({data.get('amount', '')} ريال)")
-                elif tool == "pay_debt":
-                    parts.append(f"تم تسجيل سداد: {data.get('person', '')}")
-                elif tool == "store_note":
-                    parts.append(f"تم حفظ الملاحظة ({data.get('entities_saved', 0)} عنصر)")
-                elif tool == "get_person_info":
-                    parts.append(data.get("info", ""))
-                elif tool == "manage_inventory":
-                    parts.append(data.get("results", str(data)))
-                elif tool == "manage_tasks":
-                    parts.append(data.get("tasks", str(data)))
-                elif tool == "manage_projects":
-                    if data.get("status") == "focused":
-                        parts.append(f"تم التركيز على مشروع: {data.get('name', '')}")
-                    elif data.get("status") == "unfocused":
-                        parts.append("تم إلغاء التركيز على المشروع")
-                    else:
-                        parts.append(data.get("projects", str(data)))
-                elif tool == "manage_lists":
-                    if data.get("list"):
-                        parts.append(data["list"])
-                    elif data.get("lists"):
-                        parts.append(data["lists"])
-                    else:
-                        parts.append(str(data))
-                elif tool == "merge_projects":
-                    parts.append(f"تم دمج {data.get('sources_deleted', 0)} مشاريع ونقل {data.get('tasks_moved', 0)} مهام إلى {data.get('target', '')}")
-                elif tool == "get_productivity_stats":
-                    parts.append(str(data))
-                elif tool == "send_to_user":
-                    parts.append(f"تم إرسال رسالة إلى {data.get('to', '')}")
-                else:
-                    parts.append(f"تم تنفيذ {tool}")
-            else:
-                parts.append(f"فشل {tool}: {r.get('error', r.get('data', {}).get('error', ''))}")
-        return "\n".join(parts) if parts else "تم تنفيذ الطلب."
+            if not r.get("success") or r.get("tool") in self._WRITE_TOOLS or r.get("tool") == "retrieve_file":
+                return
+        self._response_cache.store(probe, reply)
 
     async def chat(self, message: str, session_id: str = "default") -> dict:
         """Non-streaming tool-calling chat."""
         # 1. Build system prompt
         from app.middleware.auth import _current_user_nickname, _current_user_gender
-        memory_context = await self.memory.build_system_memory_context(session_id)
-        active_project = await self.memory.get_active_project(session_id)
+        memory_context, active_project, history, query_vec = await asyncio.gather(
+            self.memory.build_system_memory_context(session_id),
+            self.memory.get_active_project(session_id),
+            self.memory.get_working_memory(session_id),
+            self._embed_for_cache(message),
+        )
+        probe, cached = self._cached_reply(query_vec, message)
+        if cached:
+            self._spawn_post_process(self.post_process(message, cached, session_id))
+            return {"reply": cached, "tool_calls": [], "route": "tool_calling"}
+
         nickname = _current_user_nickname.get() or "أبو إبراهيم"
         is_female = _current_user_gender.get() == "female"
         system_prompt = build_tool_system_prompt(
@@ -1892,11 +2093,9 @@ class ToolCallingService:
             user_name=nickname, is_female=is_female,
         )
 
-        # 2. Load conversation history
-        history = await self.memory.get_working_memory(session_id)
-        messages = [{"role": "system", "content": system_prompt}]
-        messages.extend(history)
-        messages.append({"role": "user", "content": message})
+        # 2. Conversation history (fetched above)
+        # Fresh list per request: the tool loop appends to it
+        messages = [{"role": "system", "content": system_prompt}, *history, {"role": "user", "content": message}]
 
         # Track new turns added during tool-calling (for working memory storage)
         new_turns: list[dict] = []
@@ -1922,16 +2121,9 @@ class ToolCallingService:
                 break  # Final text response
 
             # Execute all tool calls in parallel
-            parsed_calls = []
-            for tc in tool_calls:
-                raw_args = tc["function"]["arguments"]
-                args = json.loads(raw_args) if isinstance(raw_args, str) and raw_args.strip() else (raw_args if isinstance(raw_args, dict) else {})
-                parsed_calls.append((tc, args))
-
-            results = await asyncio.gather(
-                *(self._execute_tool(tc["function"]["name"], args, session_id=session_id) for tc, args in parsed_calls),
-                return_exceptions=True,
-            )
+            parsed_calls = [(tc, _parse_tool_args(tc["function"]["arguments"])) for tc in tool_calls]
+
+            results = await self._execute_tool_calls(parsed_calls, session_id)
 
             # Build messages: one assistant message with all tool_calls, then individual tool results
             assistant_tc_msg = {
@@ -1949,7 +2141,7 @@ class ToolCallingService:
                 tool_msg = {
                     "role": "tool",
                     "tool_call_id": tc["id"],
-                    "content": json.dumps(result, ensure_ascii=False),
+                    "content": json_dumps(result),
                 }
                 messages.append(tool_msg)
                 new_turns.append(tool_msg)
@@ -1959,10 +2151,11 @@ class ToolCallingService:
         stripped_reply = reply.strip()
         if tool_results and (not stripped_reply or stripped_reply in ("{}", "[]", "{{}}")):
             reply = self._fallback_reply(tool_results)
+        self._maybe_cache_reply(probe, tool_results, reply)
 
         # Post-process in background
         if reply:
-            asyncio.create_task(self.post_process(
+            self._spawn_post_process(self.post_process(
                 message, reply, session_id,
                 tool_calls=tool_results, new_turns=new_turns,
             ))
@@ -1990,8 +2183,20 @@ class ToolCallingService:
 
         # 1. Build system prompt
         from app.middleware.auth import _current_user_nickname, _current_user_gender
-        memory_context = await self.memory.build_system_memory_context(session_id)
-        active_project = await self.memory.get_active_project(session_id)
+        memory_context, active_project, history, query_vec = await asyncio.gather(
+            self.memory.build_system_memory_context(session_id),
+            self.memory.get_active_project(session_id),
+            self.memory.get_working_memory(session_id),
+            self._embed_for_cache(message),
+        )
+        probe, cached = self._cached_reply(query_vec, message)
+        if cached:
+            yield _META_LINE
+            yield _token_line(cached)
+            yield '{"type":"done"}\n'
+            self._spawn_post_process(self.post_process(message, cached, session_id))
+            return
+
         nickname = _current_user_nickname.get() or "أبو إبراهيم"
         is_female = _current_user_gender.get() == "female"
         system_prompt = build_tool_system_prompt(
@@ -1999,16 +2204,14 @@ class ToolCallingService:
             user_name=nickname, is_female=is_female,
         )
 
-        # 2. Load conversation history
-        history = await self.memory.get_working_memory(session_id)
-        messages = [{"role": "system", "content": system_prompt}]
-        messages.extend(history)
-        messages.append({"role": "user", "content": message})
+        # 2. Conversation history (fetched above)
+        # Fresh list per request: the tool loop appends to it
+        messages = [{"role": "system", "content": system_prompt}, *history, {"role": "user", "content": message}]
 
         logger.info("[stream] setup done in %.1fms", (_time.monotonic() - t0) * 1000)
 
         # 3. Meta line
-        yield json.dumps({"type": "meta", "route": "tool_calling"}) + "\n"
+        yield _META_LINE
 
         # 4. Streaming tool-calling loop
         tool_results = []
@@ -2031,7 +2234,7 @@ class ToolCallingService:
                             first_token = False
                         streamed_text.append(event["content"])
                         if not buffer_mode:
-                            yield json.dumps({"type": "token", "content": event["content"]}) + "\n"
+                            yield _token_line(event["content"])
                     elif event["type"] == "tool_calls":
                         logger.info("[stream] iter %d: tool_calls detected in %.1fms — %s",
                                     i, (_time.monotonic() - t_llm) * 1000,
@@ -2040,24 +2243,17 @@ class ToolCallingService:
             except Exception as e:
                 logger.error("Stream failed (iteration %d): %s", i, e)
                 fallback = self._fallback_reply(tool_results) if tool_results else "عذراً، حصل خطأ. حاول مرة ثانية."
-                yield json.dumps({"type": "token", "content": fallback}) + "\n"
+                yield _token_line(fallback)
                 reply_text = fallback
                 break
 
             # Tool calls take priority over streamed text — Haiku sometimes emits both
             if tool_calls_found:
                 # Execute all tool calls in parallel
-                parsed_calls = []
-                for tc in tool_calls_found:
-                    raw_args = tc["function"]["arguments"]
-                    args = json.loads(raw_args) if isinstance(raw_args, str) and raw_args.strip() else (raw_args if isinstance(raw_args, dict) else {})
-                    parsed_calls.append((tc, args))
+                parsed_calls = [(tc, _parse_tool_args(tc["function"]["arguments"])) for tc in tool_calls_found]
 
                 t_exec = _time.monotonic()
-                results = await asyncio.gather(
-                    *(self._execute_tool(tc["function"]["name"], args, session_id=session_id) for tc, args in parsed_calls),
-                    return_exceptions=True,
-                )
+                results = await self._execute_tool_calls(parsed_calls, session_id)
                 logger.info("[stream] iter %d: tools executed in %.1fms", i, (_time.monotonic() - t_exec) * 1000)
 
                 assistant_tc_msg = {
@@ -2075,7 +2271,7 @@ class ToolCallingService:
                     tool_msg = {
                         "role": "tool",
                         "tool_call_id": tc["id"],
-                        "content": json.dumps(result, ensure_ascii=False),
+                        "content": json_dumps(result),
                     }
                     messages.append(tool_msg)
                     new_turns.append(tool_msg)
@@ -2091,10 +2287,10 @@ class ToolCallingService:
                 if buffer_mode and reply_text.strip() in ("{}", "[]", "{{}}"):
                     logger.warning("[stream] iter %d: junk response '%s', using fallback", i, reply_text.strip())
                     reply_text = self._fallback_reply(tool_results)
-                    yield json.dumps({"type": "token", "content": reply_text}) + "\n"
+                    yield _token_line(reply_text)
                 elif buffer_mode:
                     # Buffered text is valid — flush it now
-                    yield json.dumps({"type": "token", "content": reply_text}) + "\n"
+                    yield _token_line(reply_text)
                 logger.info("[stream] iter %d: text streamed, %d chars in %.1fms",
                             i, sum(len(c) for c in streamed_text), (_time.monotonic() - t_llm) * 1000)
                 break
@@ -2108,7 +2304,7 @@ class ToolCallingService:
         stripped_reply = reply_text.strip()
         if tool_results and (not stripped_reply or stripped_reply in ("{}", "[]", "{{}}")):
             reply_text = self._fallback_reply(tool_results)
-            yield json.dumps({"type": "token", "content": reply_text}) + "\n"
+            yield _token_line(reply_text)
 
         # Extract file attachments from retrieve_file tool results
         retrieve_results = [r for r in tool_results if r.get("tool") == "retrieve_file"]
@@ -2125,11 +2321,13 @@ class ToolCallingService:
         if file_attachments:
             done_msg["files"] = file_attachments
         logger.info("[stream] done_msg: %s", done_msg)
-        yield json.dumps(done_msg) + "\n"
+        yield json_dumps(done_msg) + "\n"
+
+        self._maybe_cache_reply(probe, tool_results, reply_text)
 
         # 5. Post-process in background
         if reply_text:
-            asyncio.create_task(self.post_process(
+            self._spawn_post_process(self.post_process(
                 message, reply_text, session_id,
                 tool_calls=tool_results, new_turns=new_turns,
             ))
@@ -2139,6 +2337,8 @@ class ToolCallingService:
     # ------------------------------------------------------------------
 
     # Tools that perform writes — auto-extraction is skipped when these were called
+    _REMINDER_WRITE_TOOLS = {"create_reminder", "delete_reminder", "update_reminder"}
+
     _WRITE_TOOLS = {
         "create_reminder", "delete_reminder", "update_reminder",
         "add_expense", "record_debt", "pay_debt", "store_note",
@@ -2147,14 +2347,6 @@ class ToolCallingService:
         "control_device", "manage_ha_names",
     }
 
-    # Lightweight keyword check for storable content (Arabic + English)
-    _STORABLE_RE = re.compile(
-        r"(يعمل|يشتغل|يدرس|عمره|ساكن|متزوج|عنده|تخرج|يحب|"
-        r"works at|lives in|married|born|age|graduated|likes|"
-        r"شركة|جامعة|مدرسة|company|university|school)",
-        re.IGNORECASE,
-    )
-
     async def post_process(
         self, query_ar: str, reply_ar: str, session_id: str,
         tool_calls: list[dict] | None = None,
@@ -2165,40 +2357,111 @@ class ToolCallingService:
             # Store full tool-calling conversation in working memory so the model
             # sees the correct pattern (user → tool_calls → tool results → reply)
             # This prevents hallucinated confirmations in subsequent turns.
-            await self.memory.push_message(session_id, "user", query_ar)
-            for turn in (new_turns or []):
-                await self.memory.push_raw(session_id, turn)
-            await self.memory.push_message(session_id, "assistant", reply_ar)
-
-            # Store as vector embedding (Arabic — BGE-M3 handles multilingual)
-            combined = f"User: {query_ar}\nAssistant: {reply_ar}"
-            await self.vector.upsert_chunks(
-                [combined],
-                [{"source_type": "conversation", "topic": "chat"}],
+            # Message counter is bumped in the same pipeline
+            msg_count = await self.memory.record_exchange(
+                session_id, query_ar, new_turns or [], reply_ar,
             )
 
+            tools_called = {tc.get("tool") for tc in (tool_calls or [])}
+            storable = _has_storable_keyword(query_ar)
+
+            # Store as vector embedding (Arabic — BGE-M3 handles multilingual).
+            # Deep into a long session, plain chit-chat turns aren't worth a vector.
+            skip_after = settings.conversation_vector_skip_after
+            if skip_after and msg_count > skip_after and not tools_called and not storable:
+                logger.debug("Skipping conversation vector for session %s (exchange %d)", session_id, msg_count)
+            else:
+                combined = f"User: {query_ar}\nAssistant: {reply_ar}"
+                await self.vector.upsert_chunks(
+                    [combined],
+                    [{"source_type": "conversation", "topic": "chat"}],
+                )
+
             # Auto-extraction: if no write tool was called, check for storable content
             # Disabled by default — saves contradictory data when user corrects info
-            tools_called = {tc.get("tool") for tc in (tool_calls or [])}
             if (
                 settings.auto_extract_enabled
                 and not (tools_called & self._WRITE_TOOLS)
-                and self._STORABLE_RE.search(query_ar)
+                and len(query_ar) >= _AUTO_EXTRACT_MIN_CHARS
+                and query_ar.count(" ") >= 2  # at least three words
+                and storable
             ):
                 await self._auto_extract(query_ar)
 
             # Periodic tasks
-            msg_count = await self.memory.increment_message_count(session_id)
-
-            if msg_count % settings.daily_summary_interval == 0:
-                await self._trigger_daily_summary(session_id)
+            do_summary = msg_count % settings.daily_summary_interval == 0
+            do_core = msg_count % settings.core_memory_interval == 0
 
-            if msg_count % settings.core_memory_interval == 0:
-                await self._trigger_core_memory_extraction(session_id)
+            if do_summary or do_core:
+                self._schedule_memory_tasks(session_id, msg_count, do_summary, do_core)
 
         except Exception as e:
             logger.error("Tool-calling post-processing failed: %s", e)
 
+    def _spawn_post_process(self, coro) -> None:
+        task = asyncio.create_task(coro)
+        self._background.add(task)
+        task.add_done_callback(self._background.discard)
+
+    def _schedule_memory_tasks(self, session_id: str, msg_count: int, do_summary: bool, do_core: bool) -> None:
+        """Start the periodic memory tasks in the background, single-flight per session.
+
+        A burst of turns can cross the thresholds while the previous run's LLM call
+        is still pending; that run is left to finish instead of being repeated.
+        Runs are skipped outright once memory_tasks_max_inflight are pending.
+        """
+        key = (_current_graph_name.get() or settings.falkordb_graph_name, session_id)
+        if key in self._memory_inflight:
+            logger.debug("Periodic memory tasks already running for %s; skipping", session_id)
+            return
+        if len(self._memory_inflight) >= settings.memory_tasks_max_inflight:
+            logger.warning("Periodic memory tasks skipped for %s: %d runs pending", session_id, len(self._memory_inflight))
+            return
+        task = asyncio.create_task(self._run_memory_tasks(session_id, msg_count, do_summary, do_core))
+        self._memory_inflight[key] = task
+        task.add_done_callback(lambda _t: self._memory_inflight.pop(key, None))
+
+    async def _run_memory_tasks(self, session_id: str, msg_count: int, do_summary: bool, do_core: bool) -> None:
+        # One fetch shared by both periodic tasks
+        try:
+            messages, mark = await asyncio.gather(
+                self.memory.get_working_memory(session_id),
+                self.memory.get_summary_mark(session_id),
+            )
+        except Exception as e:
+            logger.warning("Periodic memory tasks: working memory fetch failed: %s", e)
+            return
+        messages_text = format_transcript(messages)
+        if len(messages_text) < settings.memory_trigger_min_chars:
+            logger.debug("Periodic memory tasks skipped: transcript only %d chars", len(messages_text))
+            return
+        messages_text = _clip_transcript(messages_text)
+
+        summary_text = None
+        if do_summary:
+            # The daily summary only takes exchanges it hasn't folded in yet
+            new_messages = _last_exchanges(messages, msg_count - mark) if 0 < mark <= msg_count else messages
+            if new_messages is messages:
+                summary_text = messages_text
+            else:
+                summary_text = _clip_transcript(format_transcript(new_messages))
+            if len(summary_text) < settings.memory_trigger_min_chars:
+                logger.debug("Daily summary skipped: only %d new chars since the last one", len(summary_text))
+                summary_text = None
+
+        if summary_text is not None and do_core and settings.fuse_memory_triggers:
+            await self._trigger_end_of_window(session_id, msg_count, summary_text)
+        elif summary_text is not None and do_core:
+            # Separate prompts, disjoint Redis keys — overlap the two LLM calls
+            await asyncio.gather(
+                self._trigger_daily_summary(session_id, msg_count, summary_text),
+                self._trigger_core_memory_extraction(messages_text),
+            )
+        elif summary_text is not None:
+            await self._trigger_daily_summary(session_id, msg_count, summary_text)
+        elif do_core:
+            await self._trigger_core_memory_extraction(messages_text)
+
     # Entity types safe for auto-extraction from conversational messages.
     # Excludes Project, Task, Idea, Sprint, etc. which need explicit user intent.
     _AUTO_EXTRACT_SAFE_TYPES = {
@@ -2213,12 +2476,14 @@ class ToolCallingService:
                 entities = self.ner.extract_entities(query_ar)
                 ner_hints = self.ner.format_hints(entities)
 
-            query_en = await self.llm.translate_to_english(query_ar)
-            facts = await self.llm.extract_facts_specialized(query_en, "general", ner_hints=ner_hints)
+            facts = await self.llm.translate_and_extract(
+                query_ar, "general", ner_hints=ner_hints,
+                allowed_types=sorted(self._AUTO_EXTRACT_SAFE_TYPES),
+            )
 
             if facts.get("entities"):
-                # Filter out entity types that shouldn't be auto-created
-                # from casual conversation (Projects, Tasks, Ideas, etc.)
+                # The prompt already restricts types; filter again in case the model
+                # strays (Projects, Tasks, Ideas, etc. need explicit intent)
                 facts["entities"] = [
                     e for e in facts["entities"]
                     if e.get("entity_type") in self._AUTO_EXTRACT_SAFE_TYPES
@@ -2231,32 +2496,34 @@ class ToolCallingService:
         except Exception as e:
             logger.warning("Auto-extraction failed: %s", e)
 
-    async def _trigger_daily_summary(self, session_id: str) -> None:
+    async def _trigger_daily_summary(self, session_id: str, msg_count: int, messages_text: str) -> None:
         try:
-            messages = await self.memory.get_working_memory(session_id)
-            if not messages:
-                return
-            text = "\n".join(
-                f"{'User' if m['role'] == 'user' else 'Assistant'}: {m['content']}"
-                for m in messages
-            )
-            summary = await self.llm.summarize_daily(text)
+            previous = await self.memory.get_daily_summary()
+            async with self._memory_llm_sem:
+                summary = await self.llm.summarize_daily(messages_text, previous_summary=previous)
             await self.memory.set_daily_summary(summary)
+            await self.memory.set_summary_mark(session_id, msg_count)
         except Exception as e:
             logger.warning("Daily summary generation failed: %s", e)
 
-    async def _trigger_core_memory_extraction(self, session_id: str) -> None:
+    async def _trigger_end_of_window(self, session_id: str, msg_count: int, messages_text: str) -> None:
+        """Both periodic tasks due: one fused LLM call for summary + preferences."""
         try:
-            messages = await self.memory.get_working_memory(session_id)
-            if not messages:
-                return
-            text = "\n".join(
-                f"{'User' if m['role'] == 'user' else 'Assistant'}: {m['content']}"
-                for m in messages
-            )
-            result = await self.llm.extract_core_preferences(text)
-            for key, value in result.get("preferences", {}).items():
-                if key and value:
-                    await self.memory.set_core_memory(str(key), str(value))
+            previous = await self.memory.get_daily_summary()
+            async with self._memory_llm_sem:
+                result = await self.llm.summarize_and_extract(messages_text, previous_summary=previous)
+            summary = result.get("summary")
+            if summary:
+                await self.memory.set_daily_summary(summary)
+                await self.memory.set_summary_mark(session_id, msg_count)
+            await self.memory.set_core_memory_many(_core_pairs(result))
+        except Exception as e:
+            logger.warning("Fused summary/core memory extraction failed: %s", e)
+
+    async def _trigger_core_memory_extraction(self, messages_text: str) -> None:
+        try:
+            async with self._memory_llm_sem:
+                result = await self.llm.extract_core_preferences(messages_text)
+            await self.memory.set_core_memory_many(_core_pairs(result))
         except Exception as e:
             logger.warning("Core memory extraction failed: %s", e)
@@ -1,7 +1,12 @@
+import asyncio
 import logging
+import os
 import uuid
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 
+import numpy as np
 from qdrant_client import AsyncQdrantClient
 from qdrant_client.models import (
     Distance,
@@ -16,16 +21,24 @@ from sentence_transformers import SentenceTransformer
 
 from app.config import get_settings
 from app.middleware.auth import _current_collection
+from app.services.response_cache import note_write
 
 logger = logging.getLogger(__name__)
 
 settings = get_settings()
 
+_QUERY_VEC_CACHE_SIZE = 512
+_UPSERT_BATCH_SIZE = 64  # chunks per embed/upsert step; one batch encodes while the previous uploads
+
 
 class VectorService:
     def __init__(self):
         self._model: SentenceTransformer | None = None
         self._client: AsyncQdrantClient | None = None
+        self._query_vec_cache: OrderedDict[str, list[float]] = OrderedDict()  # query -> embedding LRU
+        # One encode at a time on the model; keeps forward passes off the event
+        # loop and out of the default pool used by other to_thread work
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="bge")
 
     def _collection(self) -> str:
         """Return the active Qdrant collection from context var or settings default."""
@@ -37,6 +50,8 @@ class VectorService:
             settings.bge_model_name,
             device=settings.bge_device,
         )
+        if settings.bge_fp16 and settings.bge_device.startswith("cuda"):
+            self._model.half()
         logger.info("BGE-M3 loaded successfully")
 
         self._client = AsyncQdrantClient(
@@ -91,10 +106,26 @@ class VectorService:
     async def stop(self):
         if self._client:
             await self._client.close()
+        self._executor.shutdown(wait=False)
+
+    def embed_array(self, texts: list[str]) -> np.ndarray:
+        """Normalized float32 embeddings as one (N, dim) array."""
+        return self._model.encode(
+            texts, batch_size=settings.bge_batch_size, normalize_embeddings=True,
+            convert_to_numpy=True, show_progress_bar=False,
+        ).astype(np.float32, copy=False)  # fp16 model outputs stay float32 downstream
 
     def embed(self, texts: list[str]) -> list[list[float]]:
-        embeddings = self._model.encode(texts, normalize_embeddings=True)
-        return embeddings.tolist()
+        # One C-level tolist() over the whole matrix, for Qdrant point/query payloads
+        return self.embed_array(texts).tolist()
+
+    async def aembed(self, texts: list[str]) -> list[list[float]]:
+        """embed() on the encoder thread so encoding doesn't block the event loop."""
+        return await asyncio.get_running_loop().run_in_executor(self._executor, self.embed, texts)
+
+    async def aembed_array(self, texts: list[str]) -> np.ndarray:
+        """embed_array() on the encoder thread, for callers doing their own NumPy math."""
+        return await asyncio.get_running_loop().run_in_executor(self._executor, self.embed_array, texts)
 
     async def upsert_chunks(
         self,
@@ -104,28 +135,50 @@ class VectorService:
         if not chunks:
             return 0
 
-        vectors = self.embed(chunks)
-        points = []
-        for i, (chunk, vec) in enumerate(zip(chunks, vectors)):
-            meta = metadata_list[i] if metadata_list and i < len(metadata_list) else {}
-            payload = {
-                "text": chunk,
-                "created_at": datetime.utcnow().isoformat(),
-                **meta,
-            }
-            points.append(
-                PointStruct(
-                    id=str(uuid.uuid4()),
-                    vector=vec,
-                    payload=payload,
+        collection = self._collection()
+        created_at = datetime.utcnow().isoformat()
+        batch = _UPSERT_BATCH_SIZE
+
+        def _points(start: int, vectors: list[list[float]]) -> list[PointStruct]:
+            points = []
+            raw = os.urandom(16 * len(vectors))  # one syscall for the batch's random ids
+            for j, vec in enumerate(vectors):
+                i = start + j
+                meta = metadata_list[i] if metadata_list and i < len(metadata_list) else {}
+                points.append(
+                    PointStruct(
+                        id=str(uuid.UUID(bytes=raw[16 * j:16 * j + 16], version=4)),
+                        vector=vec,
+                        payload={"text": chunks[i], "created_at": created_at, **meta},
+                    )
                 )
-            )
-
-        await self._client.upsert(
-            collection_name=self._collection(),
-            points=points,
+            return points
+
+        # Embed batch i+1 on the encoder thread while batch i is upserted
+        vectors = await self.aembed(chunks[:batch])
+        for start in range(0, len(chunks), batch):
+            upsert = self._client.upsert(collection_name=collection, points=_points(start, vectors))
+            nxt = start + batch
+            if nxt < len(chunks):
+                _, vectors = await asyncio.gather(upsert, self.aembed(chunks[nxt:nxt + batch]))
+            else:
+                await upsert
+        # Conversation turns are logged after every reply; they don't change tool results
+        if not metadata_list or any(m.get("source_type") != "conversation" for m in metadata_list):
+            note_write()
+        return len(chunks)
+
+    async def upsert_points(self, points: list[PointStruct]) -> None:
+        """Upsert prebuilt points into the current collection."""
+        await self._client.upsert(collection_name=self._collection(), points=points)
+        note_write()
+
+    async def set_payload(self, payload: dict, point_ids: list) -> None:
+        """Merge payload fields into existing points of the current collection."""
+        await self._client.set_payload(
+            collection_name=self._collection(), payload=payload, points=point_ids,
         )
-        return len(points)
+        note_write()
 
     async def delete_by_file_hash(self, file_hash: str) -> int:
         """Delete all Qdrant points with the given file_hash in their payload."""
@@ -136,6 +189,7 @@ class VectorService:
             ),
         )
         logger.info("Deleted chunks with file_hash=%s…: %s", file_hash[:12], result)
+        note_write()
         return 1  # Qdrant delete doesn't return count, signal success
 
     async def search(
@@ -146,7 +200,15 @@ class VectorService:
         entity_type: str | None = None,
         topic: str | None = None,
     ) -> list[dict]:
-        query_vector = self.embed([query])[0]
+        key = query.strip()
+        query_vector = self._query_vec_cache.get(key)
+        if query_vector is not None:
+            self._query_vec_cache.move_to_end(key)
+        else:
+            query_vector = (await self.aembed([key]))[0]
+            self._query_vec_cache[key] = query_vector
+            if len(self._query_vec_cache) > _QUERY_VEC_CACHE_SIZE:
+                self._query_vec_cache.popitem(last=False)
         return await self.search_by_vector(
             query_vector, limit=limit, source_type=source_type,
             entity_type=entity_type, topic=topic,
@@ -138,6 +138,23 @@ async def test_bge_m3():
         return False
 
 
+async def test_response_cache_params():
+    """Check response-cache query parameter extraction on edge-case digits."""
+    logger.info("=== Testing Response Cache Params ===")
+    try:
+        from app.services.response_cache import query_params
+
+        assert query_params("كم صرفت في شهر ٣ سنة 2025") == {"3", "2025"}
+        assert query_params("area of 10² plot") == frozenset()  # superscript, not a number
+        assert query_params("expenses in January") == {"january"}
+        assert query_params("مصاريف بيناير") == {"يناير"}
+        logger.info("  ✓ query_params handles decimal and non-decimal digits")
+        return True
+    except Exception as e:
+        logger.error("  ✗ Response cache params failed: %s", e)
+        return False
+
+
 async def main():
     logger.info("Personal Life RAG — Service Tests\n")
 
@@ -148,6 +165,7 @@ async def main():
     results["qdrant"] = await test_qdrant()
     results["redis"] = await test_redis()
     results["bge_m3"] = await test_bge_m3()
+    results["response_cache"] = await test_response_cache_params()
 
     logger.info("\n=== Summary ===")
     all_passed = True